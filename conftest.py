@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Pytest configuration for the Kafka Kerberos utility tests
+
+Author: Eon (Himanshu Shekhar)
+Created: 2025-08-15
+Description: Shared pytest setup for the test modules
+License: MIT
+Repository: https://github.com/eonn/kafka-python-kerberos
+
+Puts the repository root on sys.path once per pytest session, so the test
+modules can import the utilities without modifying sys.path themselves.
+"""
+
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
@@ -21,6 +21,7 @@ This script demonstrates various usage patterns including:
 import json
 import time
 from kafka_kerberos_utility import KafkaKerberosUtility, KafkaKerberosError
+from kafka_common import deserialize_value
 
 
 def message_handler(message, record):
@@ -77,15 +78,17 @@ def example_context_manager():
     
     try:
         with KafkaKerberosUtility() as kafka:
-            # Produce multiple messages
-            for i in range(3):
-                message = {
+            # Produce multiple messages in a single batch
+            batch = [
+                {
                     "batch_id": i,
                     "data": f"test_message_{i}",
                     "timestamp": time.time()
                 }
-                kafka.produce_message(message, key=f"batch_{i}")
-                print(f"Produced message {i}")
+                for i in range(3)
+            ]
+            sent = kafka.produce_messages(batch, keys=[f"batch_{i}" for i in range(3)])
+            print(f"Produced {sent} messages")
             
             # Consume messages with custom handler
             messages = kafka.consume_messages(
@@ -161,9 +164,11 @@ def example_advanced_usage():
             consumer = kafka.get_consumer()
             
             # Produce messages using the producer directly
+            send = producer.send
+            topic = kafka.config['topic']
             for i in range(2):
-                future = producer.send(
-                    kafka.config['topic'],
+                future = send(
+                    topic,
                     value={"direct_producer": f"message_{i}"},
                     key=f"direct_{i}"
                 )
@@ -174,7 +179,8 @@ def example_advanced_usage():
             # Consume messages using the consumer directly
             message_count = 0
             for message in consumer:
-                print(f"Direct consumer received: {message.value}")
+                # Direct consumers return the raw JSON bytes of each value
+                print(f"Direct consumer received: {deserialize_value(message.value)}")
                 message_count += 1
                 if message_count >= 2:
                     break
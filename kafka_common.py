@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Shared Helpers for the Kafka Utilities
+
+Author: Eon (Himanshu Shekhar)
+Created: 2025-08-15
+Description: Message codecs, logging and shutdown helpers shared by the Kafka utilities
+License: MIT
+Repository: https://github.com/eonn/kafka-python-kerberos
+
+This module holds the pieces KafkaKerberosUtility and SimpleKafkaUtility
+have in common, so both encode messages, log and close their clients the
+same way:
+- JSON value and UTF-8 key (de)serializers, backed by orjson when available
+- The process-wide background (queue based) log writer
+- The consumer poll loop, shared by every consume method
+- Concurrent shutdown of producers and consumers
+"""
+
+import os
+import sys
+import json
+import math
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union,
+)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+# JSON codecs used by the (de)serializers; orjson works directly on bytes.
+# Encoding is strict and gives the same JSON with or without orjson: NaN and
+# infinite floats raise ValueError and values that are not plain JSON (e.g.
+# datetime or UUID, which orjson would otherwise encode) raise TypeError.
+# Values orjson cannot encode itself, such as integers wider than 64 bits,
+# are encoded by json. When decoding, orjson reads such integers as floats,
+# where json keeps them exact.
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, allow_nan=False).encode('utf-8')
+
+
+def _check_json(value: Any):
+    """Raise for any value json.dumps(value, allow_nan=False) rejects."""
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+    elif value is None or isinstance(value, (str, int)):
+        return
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if not (key is None or isinstance(key, (str, int, float))):
+                raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+            _check_json(key)
+            _check_json(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _check_json(item)
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if ORJSON_AVAILABLE:
+    def _dumps(value: Any) -> bytes:
+        _check_json(value)
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return _json_dumps(value)
+
+    _loads = orjson.loads
+else:
+    _dumps = _json_dumps
+
+    def _loads(data: bytes) -> Any:
+        return json.loads(data.decode('utf-8'))
+
+
+# Retries of an idempotent producer; the broker de-duplicates resends, so retry until delivery.timeout
+IDEMPOTENT_RETRIES = 2**31 - 1
+
+
+def serialize_value(value: Any) -> bytes:
+    """Encode a message value as JSON; bytes values are passed through as pre-encoded JSON."""
+    return value if type(value) is bytes else _dumps(value)
+
+
+def serialize_key(key: Optional[Union[str, bytes]]) -> Optional[bytes]:
+    """Encode a message key as UTF-8 bytes; bytes keys are passed through."""
+    return None if key is None else (key if type(key) is bytes else key.encode('utf-8'))
+
+
+def deserialize_value(data: Optional[bytes]) -> Any:
+    """Decode a JSON message value."""
+    return _loads(data) if data else None
+
+
+def deserialize_key(key: Optional[bytes]) -> Optional[str]:
+    """Decode a UTF-8 message key; only a missing key is None, an empty key stays ''."""
+    return None if key is None else key.decode('utf-8')
+
+
+def _take(records: list, remaining: Optional[int]) -> Tuple[list, Optional[int]]:
+    """Cut a batch down to the records still needed; a remaining of None means no limit."""
+    if remaining is None:
+        return records, None
+    records = records[:remaining]
+    return records, remaining - len(records)
+
+
+def iter_batches(poll: Callable[..., Dict[Any, list]], max_messages: Optional[int],
+                 max_poll_records: int) -> Iterator[Tuple[list, List[Any]]]:
+    """
+    Poll a consumer until it runs dry or max_messages records have been read.
+
+    The consumers leave record values as raw JSON bytes; they are decoded here
+    once per polled batch rather than record by record in the fetcher. A poll
+    never asks for more records than are still needed, and its result is cut
+    once per partition batch instead of checking the limit per record.
+
+    Args:
+        poll: The consumer's poll method, called with max_records only
+            (e.g. functools.partial(consumer.poll, timeout_ms=...))
+        max_messages: Maximum number of records to read; 0 or None means no limit
+        max_poll_records: Records asked for per poll when there is no limit
+
+    Yields:
+        One (records, decoded values) pair per partition batch of a poll
+    """
+    remaining = max_messages or None
+    while remaining is None or remaining > 0:
+        message_batch = poll(max_records=remaining or max_poll_records)
+        if not message_batch:
+            return
+
+        for records in message_batch.values():
+            records, remaining = _take(records, remaining)
+            yield records, [deserialize_value(record.value) for record in records]
+            if remaining == 0:
+                return
+
+
+async def aiter_batches(getmany: Callable[..., Awaitable[Dict[Any, list]]],
+                        max_messages: Optional[int],
+                        max_poll_records: int) -> AsyncIterator[Tuple[list, List[Any]]]:
+    """
+    Async counterpart of iter_batches for aiokafka's getmany.
+
+    aiokafka consumers decode values themselves, so the values are the
+    records' own.
+    """
+    remaining = max_messages or None
+    while remaining is None or remaining > 0:
+        message_batch = await getmany(max_records=remaining or max_poll_records)
+        if not message_batch:
+            return
+
+        for records in message_batch.values():
+            records, remaining = _take(records, remaining)
+            yield records, [record.value for record in records]
+            if remaining == 0:
+                return
+
+
+# Process-wide log writer: every logger set up by install_log_handler feeds
+# the same queue, which a single listener thread writes to the console and to
+# every requested log file
+_log_lock = threading.Lock()
+_log_queue = queue.SimpleQueue()
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers: List[logging.Handler] = []
+_log_files: Set[str] = set()
+_log_listener: Optional[QueueListener] = None
+
+# Records are fully formatted by the listener's handlers
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+
+def _restart_log_listener():
+    """(Re)start the listener thread with the current handlers; queued records are kept."""
+    global _log_listener
+    if _log_listener is None:
+        atexit.register(_stop_log_listener)
+    else:
+        _log_listener.stop()
+    _log_listener = QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+    _log_listener.start()
+
+
+def _stop_log_listener():
+    """Write out the queued records and stop the listener thread."""
+    with _log_lock:
+        if _log_listener is not None:
+            _log_listener.stop()
+
+
+def install_log_handler(logger: logging.Logger, log_file: Optional[str] = None):
+    """
+    Send a logger's records to the background log writer.
+
+    Log records are put on a queue and written by a single QueueListener
+    thread, so logging calls never block the caller on console or file I/O.
+    The handler is attached to the logger directly, and the listener is only
+    started once it is installed; calling this again for the same logger adds
+    nothing but a new log_file. The listener is stopped at interpreter exit.
+
+    Args:
+        logger: Logger to attach the queue handler to; its level is set to
+            INFO unless one is already set
+        log_file: Optional path of a file that also receives the log records;
+            file logging is opt-in, it adds a disk write to every log call
+    """
+    with _log_lock:
+        if _queue_handler not in logger.handlers:
+            logger.addHandler(_queue_handler)
+            if logger.level == logging.NOTSET:
+                logger.setLevel(logging.INFO)
+
+        log_file = os.path.abspath(log_file) if log_file else None
+        if _log_listener is not None and (log_file is None or log_file in _log_files):
+            return
+
+        if not _log_handlers:
+            _log_handlers.append(logging.StreamHandler(sys.stdout))
+        if log_file is not None:
+            _log_handlers.append(logging.FileHandler(log_file))
+            _log_files.add(log_file)
+        for handler in _log_handlers:
+            handler.setFormatter(_log_formatter)
+
+        _restart_log_listener()
+
+
+def close_clients(clients: List[Tuple[str, str, Any]], logger: logging.Logger):
+    """
+    Close producers and consumers concurrently.
+
+    Shutdown takes as long as the slowest client rather than the sum of all
+    of them. Producers deliver their pending messages while closing; errors
+    are logged, not raised, so every client gets closed.
+
+    Args:
+        clients: (kind, label, client) tuples, kind being 'producer' or 'consumer'
+            and label naming the client in log messages
+        logger: Logger receiving the close messages
+    """
+    def close_client(client_info):
+        kind, label, client = client_info
+        try:
+            if kind == 'producer':
+                client.close(timeout=10)
+            else:
+                client.close()
+            logger.info(f"Closed {label}")
+        except Exception as e:
+            logger.error(f"Error closing {label}: {str(e)}")
+
+    if clients:
+        with ThreadPoolExecutor(max_workers=min(32, len(clients))) as executor:
+            list(executor.map(close_client, clients))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Confluent Kafka (librdkafka) Producer Backend
+
+Author: Eon (Himanshu Shekhar)
+Created: 2025-08-15
+Description: librdkafka based producer backend for the Kafka Kerberos utility
+License: MIT
+Repository: https://github.com/eonn/kafka-python-kerberos
+
+This module wraps confluent_kafka.Producer behind the subset of the
+kafka-python KafkaProducer interface used by KafkaKerberosUtility
+(send, flush and close), so the utility can switch producer backends
+without changing its produce methods.
+"""
+
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, Optional
+from kafka.errors import KafkaError, KafkaTimeoutError
+from kafka.future import Future
+try:
+    from confluent_kafka import Producer
+    CONFLUENT_AVAILABLE = True
+except ImportError:
+    CONFLUENT_AVAILABLE = False
+    Producer = None
+
+
+# Metadata of a delivered message, mirroring the fields of kafka-python's RecordMetadata
+DeliveryReport = namedtuple('DeliveryReport', ['topic', 'partition', 'offset'])
+
+
+class DeliveryFuture(Future):
+    """
+    Future resolved by a librdkafka delivery report.
+
+    Delivery reports are only served while the producer is polled, so get()
+    polls the producer until the future is resolved.
+    """
+
+    __slots__ = ('_producer',)
+
+    def __init__(self, producer):
+        super().__init__()
+        self._producer = producer
+
+    def get(self, timeout: Optional[float] = None) -> DeliveryReport:
+        """
+        Wait for the delivery report of the message.
+
+        Args:
+            timeout: Optional timeout in seconds
+
+        Returns:
+            DeliveryReport of the delivered message
+
+        Raises:
+            KafkaTimeoutError: If the message is not delivered in time
+            KafkaError: If the delivery failed
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not self.is_done:
+            remaining = 1.0 if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                raise KafkaTimeoutError(f"Timeout after waiting for {timeout} secs.")
+            self._producer.poll(remaining)
+
+        if self.failed():
+            raise self.exception
+
+        return self.value
+
+
+class ConfluentProducer:
+    """
+    KafkaProducer compatible wrapper around confluent_kafka.Producer.
+    """
+
+    def __init__(self, config: Dict[str, Any],
+                 value_serializer: Callable[[Any], Optional[bytes]],
+                 key_serializer: Callable[[Any], Optional[bytes]]):
+        """
+        Create the librdkafka producer.
+
+        Args:
+            config: librdkafka configuration (dotted property names)
+            value_serializer: Callable turning a message value into bytes
+            key_serializer: Callable turning a message key into bytes
+
+        Raises:
+            ImportError: If confluent-kafka is not installed
+        """
+        if not CONFLUENT_AVAILABLE:
+            raise ImportError(
+                "confluent-kafka is not installed. Install it with: pip install confluent-kafka"
+            )
+
+        self._producer = Producer(config)
+        self._value_serializer = value_serializer
+        self._key_serializer = key_serializer
+
+    def send(self, topic: str, value: Any = None, key: Any = None) -> DeliveryFuture:
+        """
+        Queue a message for delivery.
+
+        Args:
+            topic: Topic name
+            value: Message value (serialized with the value serializer)
+            key: Optional message key (serialized with the key serializer)
+
+        Returns:
+            DeliveryFuture resolved once the broker acknowledges the message
+        """
+        future = DeliveryFuture(self._producer)
+
+        def on_delivery(err, msg):
+            if err is not None:
+                future.failure(KafkaError(str(err)))
+            else:
+                future.success(DeliveryReport(msg.topic(), msg.partition(), msg.offset()))
+
+        value = self._value_serializer(value)
+        key = self._key_serializer(key)
+
+        try:
+            self._producer.produce(topic, value=value, key=key, on_delivery=on_delivery)
+        except BufferError:
+            # Local queue is full: serve delivery reports to make room and retry once
+            self._producer.poll(1)
+            self._producer.produce(topic, value=value, key=key, on_delivery=on_delivery)
+
+        # Serve delivery reports of earlier messages without blocking
+        self._producer.poll(0)
+
+        return future
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Block until all queued messages have been delivered.
+
+        Args:
+            timeout: Optional timeout in seconds
+
+        Raises:
+            KafkaTimeoutError: If messages are still pending after the timeout
+        """
+        pending = self._producer.flush(-1 if timeout is None else timeout)
+        if pending:
+            raise KafkaTimeoutError(f"{pending} messages still pending after flush")
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Deliver pending messages; librdkafka releases the producer on garbage collection.
+
+        Args:
+            timeout: Optional timeout in seconds
+        """
+        self.flush(timeout)
@@ -23,7 +23,7 @@ Required Environment Variables:
 - KAFKA_KEYTAB_PATH: Path to the Kerberos keytab file
 - KAFKA_PRINCIPAL: Kerberos principal (e.g., "user@REALM")
 - KAFKA_SERVICE_NAME: Kerberos service name (default: "kafka")
-- KAFKA_JAAS_CONFIG_PATH: Path to JAAS configuration file (optional)
+- KAFKA_JAAS_CONFIG_PATH: Path to JAAS configuration file for JVM clients (optional)
 
 Optional Environment Variables:
 - KAFKA_CONSUMER_GROUP_ID: Consumer group ID (default: "kafka-utility-group")
@@ -31,14 +31,39 @@ Optional Environment Variables:
 - KAFKA_MAX_POLL_RECORDS: Maximum records per poll (default: 500)
 - KAFKA_SESSION_TIMEOUT_MS: Session timeout in milliseconds (default: 30000)
 - KAFKA_HEARTBEAT_INTERVAL_MS: Heartbeat interval in milliseconds (default: 3000)
+- KAFKA_CONSUMER_TIMEOUT_MS: Idle time after which iterating a consumer stops, in milliseconds (default: 1000)
+- KAFKA_FETCH_MIN_BYTES: Minimum bytes the broker returns per fetch (default: 50000)
+- KAFKA_FETCH_MAX_WAIT_MS: Maximum fetch wait for fetch_min_bytes in milliseconds (default: 500)
+- KAFKA_FETCH_MAX_BYTES: Maximum bytes returned per fetch (default: 52428800)
+- KAFKA_MAX_PARTITION_FETCH_BYTES: Maximum bytes returned per partition per fetch (default: 4194304)
+- KAFKA_RECEIVE_BUFFER_BYTES: Socket receive buffer size (default: 1048576)
+- KAFKA_SEND_BUFFER_BYTES: Socket send buffer size (default: 1048576)
+- KAFKA_LINGER_MS: Producer batching delay in milliseconds (default: 100)
+- KAFKA_BATCH_SIZE: Producer batch size in bytes (default: 200000)
+- KAFKA_COMPRESSION_TYPE: Producer compression codec (default: "lz4")
+- KAFKA_MAX_REQUEST_SIZE: Maximum producer request size in bytes (default: 4194304)
+- KAFKA_ACKS: Producer acknowledgements, "all" or a number; ignored when idempotent (default: 1)
+- KAFKA_IDEMPOTENT: Idempotent producer with acks "all" and unbounded retries (default: true)
+- KAFKA_BACKEND: Producer backend, "kafka-python" or "confluent" (default: "kafka-python")
+- KAFKA_LOG_FILE: Also write logs to this file (default: console only)
+- KAFKA_CREATE_JAAS_CONFIG: Generate a JAAS file for JVM clients (default: false)
 """
 
 import os
 import sys
-import json
+import atexit
+import shutil
+import asyncio
+import inspect
+import stat
+import hashlib
 import logging
+import functools
+import tempfile
 import configparser
-from typing import Dict, List, Optional, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, asdict
+from typing import Dict, List, Mapping, Optional, Any, Callable, Tuple, Union
 try:
     from dotenv import load_dotenv
     DOTENV_AVAILABLE = True
@@ -46,14 +71,59 @@ except ImportError:
     DOTENV_AVAILABLE = False
     def load_dotenv():
         pass
-from kafka import KafkaProducer, KafkaConsumer
+from kafka import KafkaProducer, KafkaConsumer, TopicPartition
 from kafka.errors import KafkaError, SaslAuthenticationFailedError, KafkaConnectionError
+from kafka_confluent_backend import ConfluentProducer
+from kafka_common import (
+    IDEMPOTENT_RETRIES, serialize_value, serialize_key, deserialize_value, deserialize_key,
+    iter_batches, aiter_batches, install_log_handler, close_clients,
+)
 try:
     import gssapi
     GSSAPI_AVAILABLE = True
 except ImportError:
     GSSAPI_AVAILABLE = False
     gssapi = None
+try:
+    from aiokafka import AIOKafkaConsumer
+    AIOKAFKA_AVAILABLE = True
+except ImportError:
+    AIOKAFKA_AVAILABLE = False
+    AIOKafkaConsumer = None
+
+
+@functools.lru_cache(maxsize=None)
+def _read_config_file(path: str, mtime_ns: int) -> Tuple[Tuple[str, str], ...]:
+    """
+    Parse the [kafka] section of a config file.
+    
+    Results are cached per path and modification time, so instances created
+    from an unchanged file share one parse; editing the file invalidates it.
+    
+    Args:
+        path: Path to the configuration file
+        mtime_ns: Modification time of the file, part of the cache key
+        
+    Returns:
+        Tuple of (key, value) pairs of the [kafka] section
+    """
+    # Values are taken literally; without interpolation nothing is resolved per lookup
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(path)
+    
+    try:
+        section = parser['kafka']
+    except KeyError:
+        return ()
+    
+    return tuple(section.items())
+
+
+# Kerberos environment defaults, computed once at import
+_DEFAULT_KRB5_CONFIG = '/etc/krb5.conf'
+_DEFAULT_KRB5CCNAME = f'FILE:/tmp/krb5cc_{os.getuid()}'
+# Supported producer backends
+PRODUCER_BACKENDS = ('kafka-python', 'confluent')
 
 
 class KafkaKerberosError(Exception):
@@ -61,6 +131,88 @@ class KafkaKerberosError(Exception):
     pass
 
 
+@dataclass
+class KafkaConfig:
+    """
+    Typed schema of the utility configuration.
+    
+    Field names match the config file keys; the environment variable for a
+    field is its upper-cased name prefixed with KAFKA_. Values read from
+    files or the environment are strings and are converted in __post_init__.
+    """
+    bootstrap_servers: Optional[List[str]] = None
+    topic: Optional[str] = None
+    keytab_path: Optional[str] = None
+    principal: Optional[str] = None
+    service_name: str = 'kafka'
+    jaas_config_path: Optional[str] = None
+    consumer_group_id: str = 'kafka-utility-group'
+    auto_offset_reset: str = 'earliest'
+    max_poll_records: int = 500
+    session_timeout_ms: int = 30000
+    heartbeat_interval_ms: int = 3000
+    consumer_timeout_ms: int = 1000
+    fetch_min_bytes: int = 50000
+    fetch_max_wait_ms: int = 500
+    fetch_max_bytes: int = 52428800
+    max_partition_fetch_bytes: int = 4194304
+    receive_buffer_bytes: int = 1048576
+    send_buffer_bytes: int = 1048576
+    linger_ms: int = 100
+    batch_size: int = 200000
+    compression_type: str = 'lz4'
+    max_request_size: int = 4194304
+    acks: Union[str, int] = 1
+    idempotent: bool = True
+    backend: str = 'kafka-python'
+    log_file: Optional[str] = None
+    create_jaas_config: bool = False
+    
+    def __post_init__(self):
+        # Split the broker list once instead of on every producer/consumer build
+        if isinstance(self.bootstrap_servers, str):
+            self.bootstrap_servers = [
+                server.strip() for server in self.bootstrap_servers.split(',')
+                if server.strip()
+            ]
+        
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if field.type is int:
+                setattr(self, field.name, int(value))
+            elif field.type is bool and isinstance(value, str):
+                setattr(self, field.name, value.strip().lower() in ('1', 'true', 'yes', 'on'))
+        
+        # acks is either 'all' or a number of replicas (0, 1, -1)
+        if self.acks != 'all':
+            self.acks = int(self.acks)
+    
+    @classmethod
+    def from_sources(cls, file_config: Mapping[str, str],
+                     environ: Mapping[str, str]) -> 'KafkaConfig':
+        """
+        Build the configuration from config file values and KAFKA_* environment variables.
+        
+        Args:
+            file_config: Values from the [kafka] section of the config file
+            environ: Environment mapping, usually os.environ
+            
+        Returns:
+            KafkaConfig instance; environment values take precedence
+        """
+        known = {field.name for field in fields(cls)}
+        values = {key: value for key, value in file_config.items() if key in known}
+        
+        # Single scan of the environment for KAFKA_* variables
+        for env_name, value in environ.items():
+            if env_name.startswith('KAFKA_'):
+                key = env_name[6:].lower()
+                if key in known:
+                    values[key] = value
+        
+        return cls(**values)
+
+
 class KafkaKerberosUtility:
     """
     Kafka utility class with Kerberos authentication support.
@@ -69,6 +221,19 @@ class KafkaKerberosUtility:
     using Kerberos (GSSAPI) authentication via keytab files.
     """
     
+    # The Kerberos process environment is shared by all instances
+    _kerberos_initialized = False
+    
+    # (st_mtime_ns, st_ctime_ns, st_ino) of keytabs that passed validation, keyed by path;
+    # ctime catches chmod/chown and the inode a file replaced by mv or cp -p
+    _validated_keytabs: Dict[str, Tuple[int, int, int]] = {}
+    
+    # Generated JAAS file paths keyed by (keytab_path, principal)
+    _JAAS_CACHE: Dict[Tuple[str, str], str] = {}
+    
+    # Private (mode 0700) directory holding the generated JAAS files, created on first use
+    _jaas_dir: Optional[str] = None
+    
     def __init__(self, config_file: Optional[str] = None):
         """
         Initialize the Kafka utility with Kerberos authentication.
@@ -92,6 +257,14 @@ class KafkaKerberosUtility:
         self._producers: Dict[str, KafkaProducer] = {}
         self._consumers: Dict[str, KafkaConsumer] = {}
         
+        # Fast path for the default topic, which most calls use
+        self._default_topic = self.config['topic']
+        self._default_producer: Optional[KafkaProducer] = None
+        self._default_consumer: Optional[KafkaConsumer] = None
+        
+        # Consumer settings are the same for every topic, build them once
+        self._consumer_config = self._get_consumer_config()
+        
         # Validate configuration
         self._validate_config()
         
@@ -108,65 +281,34 @@ class KafkaKerberosUtility:
         Returns:
             Dictionary containing configuration parameters
         """
-        config = {}
+        file_config = {}
         
-        # Load from config file if provided
-        if config_file and os.path.exists(config_file):
-            parser = configparser.ConfigParser()
-            parser.read(config_file)
+        # Load from config file if provided; one stat checks existence and keys the parse cache
+        if config_file:
+            try:
+                mtime_ns = os.stat(config_file).st_mtime_ns
+            except OSError:
+                mtime_ns = None
             
-            if 'kafka' in parser:
-                config.update(parser['kafka'])
+            if mtime_ns is not None:
+                file_config.update(_read_config_file(config_file, mtime_ns))
         
         # Environment variables take precedence over config file
-        env_config = {
-            'bootstrap_servers': os.getenv('KAFKA_BOOTSTRAP_SERVERS'),
-            'topic': os.getenv('KAFKA_TOPIC'),
-            'keytab_path': os.getenv('KAFKA_KEYTAB_PATH'),
-            'principal': os.getenv('KAFKA_PRINCIPAL'),
-            'service_name': os.getenv('KAFKA_SERVICE_NAME'),
-            'jaas_config_path': os.getenv('KAFKA_JAAS_CONFIG_PATH'),
-            'consumer_group_id': os.getenv('KAFKA_CONSUMER_GROUP_ID'),
-            'auto_offset_reset': os.getenv('KAFKA_AUTO_OFFSET_RESET'),
-            'max_poll_records': os.getenv('KAFKA_MAX_POLL_RECORDS'),
-            'session_timeout_ms': os.getenv('KAFKA_SESSION_TIMEOUT_MS'),
-            'heartbeat_interval_ms': os.getenv('KAFKA_HEARTBEAT_INTERVAL_MS'),
-        }
-        
-        # Only update with non-None environment values
-        for key, value in env_config.items():
-            if value is not None:
-                config[key] = value
-        
-        # Set defaults for missing values
-        config.setdefault('service_name', 'kafka')
-        config.setdefault('consumer_group_id', 'kafka-utility-group')
-        config.setdefault('auto_offset_reset', 'earliest')
-        config.setdefault('max_poll_records', '500')
-        config.setdefault('session_timeout_ms', '30000')
-        config.setdefault('heartbeat_interval_ms', '3000')
-        
-        # Convert numeric values
-        if 'max_poll_records' in config:
-            config['max_poll_records'] = int(config['max_poll_records'])
-        if 'session_timeout_ms' in config:
-            config['session_timeout_ms'] = int(config['session_timeout_ms'])
-        if 'heartbeat_interval_ms' in config:
-            config['heartbeat_interval_ms'] = int(config['heartbeat_interval_ms'])
-        
-        return config
+        try:
+            return asdict(KafkaConfig.from_sources(file_config, os.environ))
+        except (TypeError, ValueError) as e:
+            raise KafkaKerberosError(f"Invalid configuration value: {str(e)}")
     
     def _setup_logging(self):
-        """Setup logging configuration."""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(sys.stdout),
-                logging.FileHandler('kafka_kerberos_utility.log')
-            ]
-        )
+        """
+        Setup logging configuration.
+        
+        This module's logger is attached to the process-wide background log
+        writer, whatever handlers the root logger already has. Every
+        instance's 'log_file' receives the records.
+        """
         self.logger = logging.getLogger(__name__)
+        install_log_handler(self.logger, self.config.get('log_file'))
     
     def _validate_config(self):
         """Validate required configuration parameters."""
@@ -179,35 +321,55 @@ class KafkaKerberosUtility:
                 "Please set the corresponding environment variables or provide them in the config file."
             )
         
-        # Validate keytab file exists
-        if not os.path.exists(self.config['keytab_path']):
-            raise KafkaKerberosError(
-                f"Keytab file not found: {self.config['keytab_path']}"
-            )
+        # Validate keytab file exists and is readable; a single stat is enough
+        # for a keytab that already passed validation and has not changed since
+        keytab_path = self.config['keytab_path']
+        try:
+            keytab_stat = os.stat(keytab_path)
+        except OSError:
+            raise KafkaKerberosError(f"Keytab file not found: {keytab_path}")
+        
+        keytab_version = (keytab_stat.st_mtime_ns, keytab_stat.st_ctime_ns, keytab_stat.st_ino)
+        if KafkaKerberosUtility._validated_keytabs.get(keytab_path) != keytab_version:
+            if not stat.S_ISREG(keytab_stat.st_mode) or not os.access(keytab_path, os.R_OK):
+                raise KafkaKerberosError(f"Keytab file is not a readable file: {keytab_path}")
+            KafkaKerberosUtility._validated_keytabs[keytab_path] = keytab_version
         
         # Validate bootstrap servers format
         if not self.config['bootstrap_servers']:
             raise KafkaKerberosError("Bootstrap servers cannot be empty")
+        
+        # Validate producer backend
+        if self.config['backend'] not in PRODUCER_BACKENDS:
+            raise KafkaKerberosError(
+                f"Unsupported producer backend: {self.config['backend']}. "
+                f"Supported backends: {', '.join(PRODUCER_BACKENDS)}"
+            )
     
     def _setup_kerberos(self):
         """Setup Kerberos authentication environment."""
         try:
-            # Check if GSSAPI is available
-            if not GSSAPI_AVAILABLE:
-                self.logger.warning(
-                    "GSSAPI module not available. Kerberos authentication may not work properly. "
-                    "Install gssapi with: pip install gssapi (requires system dependencies)"
-                )
-            
-            # Set Kerberos environment variables
-            os.environ['KRB5_CONFIG'] = '/etc/krb5.conf'  # Default Kerberos config
-            os.environ['KRB5CCNAME'] = f'FILE:/tmp/krb5cc_{os.getuid()}'
+            if not KafkaKerberosUtility._kerberos_initialized:
+                # Check if GSSAPI is available
+                if not GSSAPI_AVAILABLE:
+                    self.logger.warning(
+                        "GSSAPI module not available. Kerberos authentication may not work properly. "
+                        "Install gssapi with: pip install gssapi (requires system dependencies)"
+                    )
+                
+                # Set Kerberos environment variables unless already configured,
+                # so gssapi keeps using the same credential cache
+                os.environ.setdefault('KRB5_CONFIG', _DEFAULT_KRB5_CONFIG)
+                os.environ.setdefault('KRB5CCNAME', _DEFAULT_KRB5CCNAME)
+                
+                KafkaKerberosUtility._kerberos_initialized = True
             
-            # Create JAAS configuration if not provided
-            if not self.config.get('jaas_config_path'):
-                self._create_jaas_config()
-            else:
+            # kafka-python authenticates through gssapi and the credential cache;
+            # a JAAS file is only needed for JVM tools sharing this environment
+            if self.config.get('jaas_config_path'):
                 os.environ['JAVA_OPTS'] = f'-Djava.security.auth.login.config={self.config["jaas_config_path"]}'
+            elif self.config['create_jaas_config']:
+                self._create_jaas_config()
             
             self.logger.info("Kerberos authentication environment configured successfully")
             
@@ -216,6 +378,16 @@ class KafkaKerberosUtility:
     
     def _create_jaas_config(self):
         """Create JAAS configuration file for Kerberos authentication."""
+        cache_key = (self.config['keytab_path'], self.config['principal'])
+        jaas_config_path = KafkaKerberosUtility._JAAS_CACHE.get(cache_key)
+        if jaas_config_path:
+            # The file may have been removed since; then it is generated again
+            if os.path.isfile(jaas_config_path):
+                os.environ['JAVA_OPTS'] = f'-Djava.security.auth.login.config={jaas_config_path}'
+                self.config['jaas_config_path'] = jaas_config_path
+                return
+            del KafkaKerberosUtility._JAAS_CACHE[cache_key]
+        
         jaas_config_content = f"""
 KafkaClient {{
     com.sun.security.auth.module.Krb5LoginModule required
@@ -226,15 +398,30 @@ KafkaClient {{
 }};
 """
         
-        jaas_config_path = '/tmp/kafka_jaas.conf'
+        # Name the file after its content so an identical file is never rewritten
+        digest = hashlib.sha256(jaas_config_content.encode('utf-8')).hexdigest()[:16]
         try:
-            with open(jaas_config_path, 'w') as f:
-                f.write(jaas_config_content)
+            # The file is trusted by JVM tools, so it is never put where another
+            # user could plant it: only this process writes to the private directory
+            jaas_dir = KafkaKerberosUtility._jaas_dir
+            if jaas_dir is None or not os.path.isdir(jaas_dir):
+                jaas_dir = KafkaKerberosUtility._jaas_dir = tempfile.mkdtemp(prefix='kafka_jaas_')
+                atexit.register(shutil.rmtree, jaas_dir, True)
+            
+            jaas_config_path = os.path.join(jaas_dir, f'kafka_jaas_{digest}.conf')
+            try:
+                fd = os.open(jaas_config_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                # Already written by this process, e.g. by a concurrent instance
+                pass
+            else:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(jaas_config_content)
+                self.logger.info(f"Created JAAS configuration at: {jaas_config_path}")
             
             os.environ['JAVA_OPTS'] = f'-Djava.security.auth.login.config={jaas_config_path}'
             self.config['jaas_config_path'] = jaas_config_path
-            
-            self.logger.info(f"Created JAAS configuration at: {jaas_config_path}")
+            KafkaKerberosUtility._JAAS_CACHE[cache_key] = jaas_config_path
             
         except Exception as e:
             raise KafkaKerberosError(f"Failed to create JAAS configuration: {str(e)}")
@@ -246,42 +433,140 @@ KafkaClient {{
         Returns:
             Dictionary containing producer configuration
         """
-        return {
-            'bootstrap_servers': self.config['bootstrap_servers'].split(','),
+        producer_config = {
+            'bootstrap_servers': self.config['bootstrap_servers'],
             'security_protocol': 'SASL_PLAINTEXT',
             'sasl_mechanism': 'GSSAPI',
             'sasl_kerberos_service_name': self.config['service_name'],
-            'value_serializer': lambda v: json.dumps(v).encode('utf-8'),
-            'key_serializer': lambda k: k.encode('utf-8') if k else None,
-            'acks': 'all',
+            'value_serializer': serialize_value,
+            'key_serializer': serialize_key,
+            'acks': self.config['acks'],
+            'retries': 3,
+            'max_in_flight_requests_per_connection': 5,
+            'linger_ms': self.config['linger_ms'],
+            'batch_size': self.config['batch_size'],
+            'compression_type': self.config['compression_type'],
+            'max_request_size': self.config['max_request_size'],
+            'send_buffer_bytes': self.config['send_buffer_bytes'],
+            'receive_buffer_bytes': self.config['receive_buffer_bytes'],
+        }
+        
+        # Idempotence keeps per-partition ordering with 5 requests in flight
+        # and makes retries safe; it requires acknowledgement by all replicas
+        if self.config['idempotent']:
+            producer_config.update({
+                'enable_idempotence': True,
+                'acks': 'all',
+                'retries': IDEMPOTENT_RETRIES,
+            })
+        
+        return producer_config
+    
+    def _get_confluent_producer_config(self) -> Dict[str, Any]:
+        """
+        Get librdkafka producer configuration with Kerberos authentication.
+        
+        Returns:
+            Dictionary containing confluent-kafka producer configuration
+        """
+        producer_config = {
+            'bootstrap.servers': ','.join(self.config['bootstrap_servers']),
+            'security.protocol': 'SASL_PLAINTEXT',
+            'sasl.mechanism': 'GSSAPI',
+            'sasl.kerberos.service.name': self.config['service_name'],
+            'sasl.kerberos.keytab': self.config['keytab_path'],
+            'sasl.kerberos.principal': self.config['principal'],
+            'acks': self.config['acks'],
             'retries': 3,
-            'max_in_flight_requests_per_connection': 1,
+            'max.in.flight.requests.per.connection': 5,
+            'linger.ms': self.config['linger_ms'],
+            'batch.size': self.config['batch_size'],
+            'compression.type': self.config['compression_type'],
+            'message.max.bytes': self.config['max_request_size'],
+            'socket.send.buffer.bytes': self.config['send_buffer_bytes'],
+            'socket.receive.buffer.bytes': self.config['receive_buffer_bytes'],
         }
+        
+        if self.config['idempotent']:
+            producer_config.update({
+                'enable.idempotence': True,
+                'acks': 'all',
+                'retries': IDEMPOTENT_RETRIES,
+            })
+        
+        return producer_config
+    
+    def _create_producer(self):
+        """
+        Create a producer for the configured backend.
+        
+        Returns:
+            KafkaProducer, or ConfluentProducer when the confluent backend is selected
+        """
+        if self.config['backend'] == 'confluent':
+            return ConfluentProducer(
+                self._get_confluent_producer_config(),
+                value_serializer=serialize_value,
+                key_serializer=serialize_key,
+            )
+        
+        return KafkaProducer(**self._get_producer_config())
     
-    def _get_consumer_config(self, topic: Optional[str] = None) -> Dict[str, Any]:
+    def _get_consumer_config(self) -> Dict[str, Any]:
         """
         Get Kafka consumer configuration with Kerberos authentication.
         
-        Args:
-            topic: Optional topic name (uses default if not provided)
-            
         Returns:
             Dictionary containing consumer configuration
         """
         return {
-            'bootstrap_servers': self.config['bootstrap_servers'].split(','),
+            'bootstrap_servers': self.config['bootstrap_servers'],
+            'security_protocol': 'SASL_PLAINTEXT',
+            'sasl_mechanism': 'GSSAPI',
+            'sasl_kerberos_service_name': self.config['service_name'],
+            'group_id': self.config['consumer_group_id'],
+            'auto_offset_reset': self.config['auto_offset_reset'],
+            # Offsets are committed once per consume_messages batch
+            'enable_auto_commit': False,
+            'max_poll_records': self.config['max_poll_records'],
+            'session_timeout_ms': self.config['session_timeout_ms'],
+            'heartbeat_interval_ms': self.config['heartbeat_interval_ms'],
+            # Lets `for record in consumer` end once the topic is idle
+            'consumer_timeout_ms': self.config['consumer_timeout_ms'],
+            'fetch_min_bytes': self.config['fetch_min_bytes'],
+            'fetch_max_wait_ms': self.config['fetch_max_wait_ms'],
+            'fetch_max_bytes': self.config['fetch_max_bytes'],
+            'max_partition_fetch_bytes': self.config['max_partition_fetch_bytes'],
+            'receive_buffer_bytes': self.config['receive_buffer_bytes'],
+            'send_buffer_bytes': self.config['send_buffer_bytes'],
+            # Values are decoded per polled batch in the consume methods
+            'key_deserializer': deserialize_key,
+        }
+    
+    def _get_aiokafka_consumer_config(self) -> Dict[str, Any]:
+        """
+        Get aiokafka consumer configuration with Kerberos authentication.
+        
+        Returns:
+            Dictionary containing AIOKafkaConsumer configuration
+        """
+        return {
+            'bootstrap_servers': self.config['bootstrap_servers'],
             'security_protocol': 'SASL_PLAINTEXT',
             'sasl_mechanism': 'GSSAPI',
             'sasl_kerberos_service_name': self.config['service_name'],
             'group_id': self.config['consumer_group_id'],
             'auto_offset_reset': self.config['auto_offset_reset'],
-            'enable_auto_commit': True,
-            'auto_commit_interval_ms': 1000,
+            'enable_auto_commit': False,
             'max_poll_records': self.config['max_poll_records'],
             'session_timeout_ms': self.config['session_timeout_ms'],
             'heartbeat_interval_ms': self.config['heartbeat_interval_ms'],
-            'value_deserializer': lambda v: json.loads(v.decode('utf-8')) if v else None,
-            'key_deserializer': lambda k: k.decode('utf-8') if k else None,
+            'fetch_min_bytes': self.config['fetch_min_bytes'],
+            'fetch_max_wait_ms': self.config['fetch_max_wait_ms'],
+            'fetch_max_bytes': self.config['fetch_max_bytes'],
+            'max_partition_fetch_bytes': self.config['max_partition_fetch_bytes'],
+            'value_deserializer': deserialize_value,
+            'key_deserializer': deserialize_key,
         }
     
     def get_producer(self, topic: Optional[str] = None) -> KafkaProducer:
@@ -297,91 +582,234 @@ KafkaClient {{
         Raises:
             KafkaKerberosError: If producer creation fails
         """
-        topic = topic or self.config['topic']
+        if topic is None or topic == self._default_topic:
+            if self._default_producer is None:
+                self._default_producer = self._new_producer(self._default_topic)
+            return self._default_producer
         
-        if topic not in self._producers:
-            try:
-                producer_config = self._get_producer_config()
-                self._producers[topic] = KafkaProducer(**producer_config)
-                self.logger.info(f"Created producer for topic: {topic}")
-            except Exception as e:
-                raise KafkaKerberosError(f"Failed to create producer for topic {topic}: {str(e)}")
+        producer = self._producers.get(topic)
+        if producer is None:
+            producer = self._new_producer(topic)
         
-        return self._producers[topic]
+        return producer
+    
+    def _new_producer(self, topic: str) -> KafkaProducer:
+        """Create a producer for the topic and register it in the producers cache."""
+        try:
+            producer = self._producers[topic] = self._create_producer()
+            self.logger.info(f"Created producer for topic: {topic}")
+            return producer
+        except Exception as e:
+            raise KafkaKerberosError(f"Failed to create producer for topic {topic}: {str(e)}")
     
     def get_consumer(self, topic: Optional[str] = None) -> KafkaConsumer:
         """
         Get or create a Kafka consumer for the specified topic.
         
+        Record values are left as raw JSON bytes, decoded per polled batch by
+        kafka_common.iter_batches; callers reading records directly decode
+        them with kafka_common.deserialize_value. Record keys are decoded to str.
+        
         Args:
             topic: Optional topic name (uses default if not provided)
             
         Returns:
-            KafkaConsumer instance
+            KafkaConsumer instance yielding records with raw bytes values
             
         Raises:
             KafkaKerberosError: If consumer creation fails
         """
-        topic = topic or self.config['topic']
+        if topic is None or topic == self._default_topic:
+            if self._default_consumer is None:
+                self._default_consumer = self._new_consumer(self._default_topic)
+            return self._default_consumer
         
-        if topic not in self._consumers:
-            try:
-                consumer_config = self._get_consumer_config(topic)
-                consumer = KafkaConsumer(topic, **consumer_config)
-                self._consumers[topic] = consumer
-                self.logger.info(f"Created consumer for topic: {topic}")
-            except Exception as e:
-                raise KafkaKerberosError(f"Failed to create consumer for topic {topic}: {str(e)}")
+        consumer = self._consumers.get(topic)
+        if consumer is None:
+            consumer = self._new_consumer(topic)
         
-        return self._consumers[topic]
+        return consumer
     
-    def produce_message(self, message: Any, key: Optional[str] = None, 
-                       topic: Optional[str] = None) -> bool:
+    def _new_consumer(self, topic: str) -> KafkaConsumer:
+        """Create a consumer for the topic and register it in the consumers cache."""
+        try:
+            consumer = self._consumers[topic] = KafkaConsumer(topic, **self._consumer_config)
+            self.logger.info(f"Created consumer for topic: {topic}")
+            return consumer
+        except Exception as e:
+            raise KafkaKerberosError(f"Failed to create consumer for topic {topic}: {str(e)}")
+    
+    def produce_message(self, message: Any, key: Optional[Union[str, bytes]] = None, 
+                       topic: Optional[str] = None,
+                       return_metadata: bool = False) -> Union[bool, Any]:
         """
         Produce a message to Kafka.
         
         Args:
-            message: Message to produce (will be JSON serialized)
-            key: Optional message key
+            message: Message to produce (JSON serialized; bytes are sent as pre-encoded JSON)
+            key: Optional message key (str or bytes)
             topic: Optional topic name (uses default if not provided)
+            return_metadata: Return the broker's record metadata instead of True;
+                when False the acknowledgement is only waited for, not inspected
             
         Returns:
-            True if message was sent successfully, False otherwise
+            True if message was sent successfully, or the record metadata
+            (topic, partition, offset) when return_metadata is True
             
         Raises:
             KafkaKerberosError: If message production fails
         """
-        topic = topic or self.config['topic']
+        topic = topic or self._default_topic
         
         try:
             producer = self.get_producer(topic)
             
             future = producer.send(topic, value=message, key=key)
+            
+            # Waiting raises on delivery failure, which is all a boolean caller needs
+            if not return_metadata:
+                future.get(timeout=10)
+                return True
+            
             record_metadata = future.get(timeout=10)
             
-            self.logger.info(
-                f"Message sent successfully to topic {record_metadata.topic} "
-                f"partition {record_metadata.partition} offset {record_metadata.offset}"
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Message sent successfully to topic %s partition %d offset %d",
+                    record_metadata.topic, record_metadata.partition, record_metadata.offset
+                )
             
-            return True
+            return record_metadata
             
         except Exception as e:
             self.logger.error(f"Failed to produce message to topic {topic}: {str(e)}")
             raise KafkaKerberosError(f"Message production failed: {str(e)}")
     
+    # Explicit name for the blocking variant, mirroring produce_message_async
+    produce_message_sync = produce_message
+    
+    def produce_message_async(self, message: Any, key: Optional[Union[str, bytes]] = None,
+                              topic: Optional[str] = None):
+        """
+        Produce a message to Kafka without waiting for the broker acknowledgement.
+        
+        The message is queued on the producer and sent in the background, so
+        consecutive calls can be batched together. Delivery failures are logged
+        by an errback; call flush() to wait for all pending messages.
+        
+        Args:
+            message: Message to produce (JSON serialized; bytes are sent as pre-encoded JSON)
+            key: Optional message key (str or bytes)
+            topic: Optional topic name (uses default if not provided)
+            
+        Returns:
+            Future resolving to the record metadata once the message is delivered
+            
+        Raises:
+            KafkaKerberosError: If the message cannot be queued
+        """
+        topic = topic or self._default_topic
+        
+        try:
+            producer = self.get_producer(topic)
+            
+            future = producer.send(topic, value=message, key=key)
+            future.add_errback(self._on_send_error, topic)
+            
+            return future
+            
+        except Exception as e:
+            self.logger.error(f"Failed to produce message to topic {topic}: {str(e)}")
+            raise KafkaKerberosError(f"Message production failed: {str(e)}")
+    
+    def produce_messages(self, messages: List[Any],
+                         keys: Optional[List[Optional[Union[str, bytes]]]] = None,
+                         topic: Optional[str] = None) -> int:
+        """
+        Produce a batch of messages to Kafka with a single flush.
+        
+        All messages are queued without blocking so the producer can group them
+        into batched requests, then the producer is flushed once.
+        
+        Args:
+            messages: Messages to produce (each JSON serialized; bytes are sent as-is)
+            keys: Optional message keys, one per message
+            topic: Optional topic name (uses default if not provided)
+            
+        Returns:
+            Number of messages delivered successfully
+            
+        Raises:
+            KafkaKerberosError: If any message fails to be delivered
+        """
+        topic = topic or self._default_topic
+        
+        if keys is None:
+            keys = [None] * len(messages)
+        elif len(keys) != len(messages):
+            raise KafkaKerberosError("Number of keys must match number of messages")
+        
+        try:
+            producer = self.get_producer(topic)
+            send = producer.send
+            
+            futures = [send(topic, value=message, key=key)
+                       for message, key in zip(messages, keys)]
+            producer.flush()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to produce messages to topic {topic}: {str(e)}")
+            raise KafkaKerberosError(f"Batch message production failed: {str(e)}")
+        
+        failed = [future for future in futures if future.failed()]
+        if failed:
+            raise KafkaKerberosError(
+                f"Failed to deliver {len(failed)} of {len(futures)} messages to topic {topic}: "
+                f"{str(failed[0].exception)}"
+            )
+        
+        self.logger.info(f"Sent {len(futures)} messages to topic {topic}")
+        
+        return len(futures)
+    
+    def _on_send_error(self, topic: str, exc: Exception):
+        """Log a failed asynchronous delivery."""
+        self.logger.error(f"Failed to deliver message to topic {topic}: {str(exc)}")
+    
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Block until all pending messages of every producer have been sent.
+        
+        Args:
+            timeout: Optional timeout in seconds
+            
+        Raises:
+            KafkaKerberosError: If flushing fails or times out
+        """
+        try:
+            for producer in self._producers.values():
+                producer.flush(timeout)
+        except Exception as e:
+            raise KafkaKerberosError(f"Failed to flush producers: {str(e)}")
+    
     def consume_messages(self, topic: Optional[str] = None, 
                         message_handler: Optional[Callable] = None,
                         max_messages: Optional[int] = None,
-                        timeout_ms: int = 1000) -> List[Any]:
+                        timeout_ms: int = 1000,
+                        commit_on_batch: bool = True) -> List[Any]:
         """
         Consume messages from Kafka.
         
         Args:
             topic: Optional topic name (uses default if not provided)
-            message_handler: Optional callback function to process each message
+            message_handler: Optional callback function to process each message,
+                called with the decoded message and the raw record
             max_messages: Optional maximum number of messages to consume
             timeout_ms: Timeout for polling messages in milliseconds
+            commit_on_batch: Commit offsets once after the batch has been handled;
+                pass False to manage commits yourself (e.g. commit before processing
+                for at-most-once delivery). Nothing is committed if the handler
+                raised for any message, so the batch is delivered again
             
         Returns:
             List of consumed messages
@@ -389,41 +817,20 @@ KafkaClient {{
         Raises:
             KafkaKerberosError: If message consumption fails
         """
-        topic = topic or self.config['topic']
+        topic = topic or self._default_topic
         messages = []
         
         try:
             consumer = self.get_consumer(topic)
+            poll = functools.partial(consumer.poll, timeout_ms=timeout_ms)
             
-            message_count = 0
-            while True:
-                if max_messages and message_count >= max_messages:
-                    break
-                
-                message_batch = consumer.poll(timeout_ms=timeout_ms)
-                
-                for tp, records in message_batch.items():
-                    for record in records:
-                        message = record.value
-                        messages.append(message)
-                        message_count += 1
-                        
-                        self.logger.info(
-                            f"Received message from topic {record.topic} "
-                            f"partition {record.partition} offset {record.offset}: {message}"
-                        )
-                        
-                        if message_handler:
-                            try:
-                                message_handler(message, record)
-                            except Exception as e:
-                                self.logger.error(f"Message handler error: {str(e)}")
-                        
-                        if max_messages and message_count >= max_messages:
-                            break
-                
-                if not message_batch:
-                    break
+            handled = True
+            for records, values in iter_batches(poll, max_messages, self.config['max_poll_records']):
+                messages.extend(values)
+                handled = self._handle_batch(records, values, message_handler) and handled
+            
+            if commit_on_batch and messages:
+                self._commit_if_handled(consumer, handled)
             
             return messages
             
@@ -431,24 +838,249 @@ KafkaClient {{
             self.logger.error(f"Failed to consume messages from topic {topic}: {str(e)}")
             raise KafkaKerberosError(f"Message consumption failed: {str(e)}")
     
-    def close(self):
-        """Close all producers and consumers."""
+    def consume_messages_parallel(self, topic: Optional[str] = None,
+                                  partitions: Optional[List[int]] = None,
+                                  message_handler: Optional[Callable] = None,
+                                  max_messages: Optional[int] = None,
+                                  timeout_ms: int = 1000,
+                                  max_workers: Optional[int] = None) -> List[Any]:
+        """
+        Consume messages from several partitions in parallel.
+        
+        Each partition is read by its own consumer, manually assigned to the
+        partition (no group rebalancing), in a worker thread. Socket I/O releases
+        the GIL, so partitions are fetched concurrently.
+        
+        Args:
+            topic: Optional topic name (uses default if not provided)
+            partitions: Optional partition numbers (all partitions of the topic if not provided)
+            message_handler: Optional callback function to process each message;
+                it is called from worker threads and must be thread-safe
+            max_messages: Optional maximum number of messages to consume, split
+                across partitions; when it does not divide evenly the first
+                partitions read one message more
+            timeout_ms: Timeout for polling messages in milliseconds
+            max_workers: Optional number of worker threads (one per partition by default)
+            
+        Returns:
+            List of consumed messages, grouped by partition
+            
+        Raises:
+            KafkaKerberosError: If message consumption fails
+        """
+        topic = topic or self._default_topic
+        
         try:
-            # Close producers
-            for topic, producer in self._producers.items():
-                producer.close()
-                self.logger.info(f"Closed producer for topic: {topic}")
+            if partitions is None:
+                partitions = self._partitions_for_topic(topic)
+            
+            if not partitions:
+                return []
+            
+            # Budgets add up to exactly max_messages, so nothing is handled and
+            # committed beyond what is returned; partitions with no budget are skipped
+            if max_messages:
+                base, extra = divmod(max_messages, len(partitions))
+                budgets = [base + 1 if index < extra else base for index in range(len(partitions))]
+                partitions, budgets = zip(*[
+                    (partition, budget) for partition, budget in zip(partitions, budgets) if budget
+                ])
+            else:
+                budgets = [None] * len(partitions)
+            
+            def consume_partition(partition: int, budget: Optional[int]) -> List[Any]:
+                consumer = KafkaConsumer(**self._consumer_config)
+                try:
+                    consumer.assign([TopicPartition(topic, partition)])
+                    poll = functools.partial(consumer.poll, timeout_ms=timeout_ms)
+                    messages = []
+                    handled = True
+                    
+                    for records, values in iter_batches(poll, budget, self.config['max_poll_records']):
+                        messages.extend(values)
+                        handled = self._handle_batch(records, values, message_handler) and handled
+                    
+                    if messages:
+                        self._commit_if_handled(consumer, handled)
+                    
+                    return messages
+                finally:
+                    consumer.close()
             
-            # Close consumers
-            for topic, consumer in self._consumers.items():
-                consumer.close()
-                self.logger.info(f"Closed consumer for topic: {topic}")
+            with ThreadPoolExecutor(max_workers=max_workers or len(partitions)) as executor:
+                results = list(executor.map(consume_partition, partitions, budgets))
             
-            self._producers.clear()
-            self._consumers.clear()
+            return [message for partition_messages in results for message in partition_messages]
             
         except Exception as e:
-            self.logger.error(f"Error closing connections: {str(e)}")
+            self.logger.error(f"Failed to consume messages in parallel from topic {topic}: {str(e)}")
+            raise KafkaKerberosError(f"Parallel message consumption failed: {str(e)}")
+    
+    def _handle_batch(self, records: list, values: List[Any],
+                      message_handler: Optional[Callable]) -> bool:
+        """
+        Pass each decoded message of a batch to the handler, logging it at DEBUG level.
+        
+        Returns:
+            False if the handler raised for any message, True otherwise
+        """
+        handled = True
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        if not (message_handler or debug_enabled):
+            return handled
+        
+        for record, message in zip(records, values):
+            if debug_enabled:
+                self.logger.debug(
+                    "Received message from topic %s partition %d offset %d: %s",
+                    record.topic, record.partition, record.offset, message
+                )
+            
+            if message_handler:
+                try:
+                    message_handler(message, record)
+                except Exception as e:
+                    handled = False
+                    self.logger.error(f"Message handler error: {str(e)}")
+        
+        return handled
+    
+    def _commit_if_handled(self, consumer: KafkaConsumer, handled: bool):
+        """
+        Commit the consumer's offsets unless a message handler failed.
+        
+        A commit covers every record consumed so far, so after a handler error
+        nothing is committed and the batch is delivered again.
+        """
+        if handled:
+            consumer.commit()
+        else:
+            self.logger.warning("Offsets not committed: message handler failed")
+    
+    def _partitions_for_topic(self, topic: str) -> List[int]:
+        """
+        Look up the partition numbers of a topic.
+        
+        A short-lived consumer without a group is used, so the lookup does not
+        join the consumer group the partition workers commit offsets for.
+        """
+        consumer = KafkaConsumer(**{**self._consumer_config, 'group_id': None})
+        try:
+            return sorted(consumer.partitions_for_topic(topic) or [])
+        finally:
+            consumer.close()
+    
+    async def aconsume_messages(self, topic: Optional[str] = None,
+                                message_handler: Optional[Callable] = None,
+                                max_messages: Optional[int] = None,
+                                timeout_ms: int = 1000):
+        """
+        Consume messages asynchronously with aiokafka.
+        
+        This is an async generator: aiokafka keeps fetching in the background
+        while the handler and the caller process the current batch. Offsets are
+        committed after each batch has been handled, until the handler raises.
+        
+        Args:
+            topic: Optional topic name (uses default if not provided)
+            message_handler: Optional callback, or coroutine function, to process each message
+            max_messages: Optional maximum number of messages to consume
+            timeout_ms: Stop when no message arrives within this many milliseconds
+            
+        Yields:
+            Consumed messages
+            
+        Raises:
+            KafkaKerberosError: If aiokafka is unavailable or message consumption fails
+        """
+        if not AIOKAFKA_AVAILABLE:
+            raise KafkaKerberosError(
+                "aiokafka is not installed. Install it with: pip install aiokafka"
+            )
+        
+        topic = topic or self._default_topic
+        
+        try:
+            consumer = AIOKafkaConsumer(topic, **self._get_aiokafka_consumer_config())
+            await consumer.start()
+        except Exception as e:
+            raise KafkaKerberosError(f"Failed to create async consumer for topic {topic}: {str(e)}")
+        
+        try:
+            getmany = functools.partial(consumer.getmany, timeout_ms=timeout_ms)
+            batches = aiter_batches(getmany, max_messages, self.config['max_poll_records'])
+            
+            # Once a handler call failed nothing more is committed: a commit
+            # covers every record consumed so far, the failed one included
+            handled = True
+            async for records, values in batches:
+                for record, message in zip(records, values):
+                    if message_handler:
+                        try:
+                            result = message_handler(message, record)
+                            if inspect.isawaitable(result):
+                                await result
+                        except Exception as e:
+                            handled = False
+                            self.logger.error(f"Message handler error: {str(e)}")
+                    
+                    yield message
+                
+                if handled:
+                    await consumer.commit()
+            
+            if not handled:
+                self.logger.warning("Offsets not committed: message handler failed")
+                
+        except Exception as e:
+            self.logger.error(f"Failed to consume messages from topic {topic}: {str(e)}")
+            raise KafkaKerberosError(f"Async message consumption failed: {str(e)}")
+        finally:
+            await consumer.stop()
+    
+    def consume_messages_aiokafka(self, topic: Optional[str] = None,
+                                  message_handler: Optional[Callable] = None,
+                                  max_messages: Optional[int] = None,
+                                  timeout_ms: int = 1000) -> List[Any]:
+        """
+        Blocking wrapper around aconsume_messages for synchronous callers.
+        
+        Args:
+            topic: Optional topic name (uses default if not provided)
+            message_handler: Optional callback, or coroutine function, to process each message
+            max_messages: Optional maximum number of messages to consume
+            timeout_ms: Stop when no message arrives within this many milliseconds
+            
+        Returns:
+            List of consumed messages
+            
+        Raises:
+            KafkaKerberosError: If aiokafka is unavailable or message consumption fails
+        """
+        async def collect() -> List[Any]:
+            return [message async for message in self.aconsume_messages(
+                topic, message_handler, max_messages, timeout_ms
+            )]
+        
+        return asyncio.run(collect())
+    
+    def close(self):
+        """
+        Close all producers and consumers.
+        
+        Clients are closed concurrently by close_clients; producers deliver
+        their pending messages first.
+        """
+        clients = [('producer', f'producer for topic: {topic}', producer)
+                   for topic, producer in self._producers.items()]
+        clients += [('consumer', f'consumer for topic: {topic}', consumer)
+                    for topic, consumer in self._consumers.items()]
+        close_clients(clients, self.logger)
+        
+        self._producers.clear()
+        self._consumers.clear()
+        self._default_producer = None
+        self._default_consumer = None
     
     def __enter__(self):
         """Context manager entry."""
@@ -63,10 +63,20 @@ setup(
         "dev": [
             "pytest>=6.0",
             "pytest-cov>=2.0",
+            "pytest-xdist>=2.0",
             "black>=21.0",
             "flake8>=3.8",
             "mypy>=0.800",
         ],
+        "fast": [
+            "orjson>=3.0",
+        ],
+        "confluent": [
+            "confluent-kafka>=2.0",
+        ],
+        "async": [
+            "aiokafka>=0.8",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -14,12 +14,20 @@ This module provides a basic Kafka utility for testing without Kerberos authenti
 """
 
 import os
-import sys
-import json
 import logging
-from typing import Dict, List, Optional, Any, Callable
+import functools
+from typing import Dict, Iterator, List, Optional, Any, Callable, Union
 from kafka import KafkaProducer, KafkaConsumer
 from kafka.errors import KafkaError
+from kafka.future import Future
+from kafka_common import (
+    IDEMPOTENT_RETRIES, serialize_value, serialize_key, deserialize_key,
+    iter_batches, install_log_handler, close_clients,
+)
+
+
+# Library logger: stays silent unless the application (or _setup_logging) adds handlers
+logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
 class SimpleKafkaError(Exception):
@@ -44,24 +52,33 @@ class SimpleKafkaUtility:
         """
         self.config = config
         
+        # Resolved once instead of a config lookup on every call
+        self._default_topic = config['topic']
+        
+        # Parsed once so producer and consumer configs always agree
+        self._bootstrap_servers: List[str] = [
+            server.strip() for server in config['bootstrap_servers'].split(',')
+        ]
+        
         # Setup logging
         self._setup_logging()
         
-        # Initialize producers and consumers cache
-        self._producers: Dict[str, KafkaProducer] = {}
+        # Initialize producer and consumers cache; KafkaProducer is thread-safe
+        # and sends to any topic, so a single instance is shared by all topics
+        self._producer: Optional[KafkaProducer] = None
         self._consumers: Dict[str, KafkaConsumer] = {}
     
     def _setup_logging(self):
-        """Setup logging configuration."""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(sys.stdout),
-                logging.FileHandler('simple_kafka_utility.log')
-            ]
-        )
+        """
+        Setup logging configuration.
+        
+        This module's logger is attached once to the process-wide background
+        log writer that KafkaKerberosUtility also uses, so records are written
+        once however many instances of either utility exist. Records also go
+        to the file named by the optional 'log_file' config key.
+        """
         self.logger = logging.getLogger(__name__)
+        install_log_handler(self.logger, self.config.get('log_file'))
     
     def _get_producer_config(self) -> Dict[str, Any]:
         """
@@ -70,14 +87,30 @@ class SimpleKafkaUtility:
         Returns:
             Dictionary containing producer configuration
         """
-        return {
-            'bootstrap_servers': self.config['bootstrap_servers'].split(','),
-            'value_serializer': lambda v: json.dumps(v).encode('utf-8'),
-            'key_serializer': lambda k: k.encode('utf-8') if k else None,
+        producer_config = {
+            'bootstrap_servers': self._bootstrap_servers,
+            'value_serializer': serialize_value,
+            'key_serializer': serialize_key,
             'acks': 'all',
             'retries': 3,
-            'max_in_flight_requests_per_connection': 1,
+            'max_in_flight_requests_per_connection': 5,
+            'linger_ms': self.config.get('linger_ms', 100),
+            'batch_size': self.config.get('batch_size', 65536),
+            'compression_type': self.config.get('compression_type', 'lz4'),
+            'max_request_size': self.config.get('max_request_size', 4194304),
+            'send_buffer_bytes': self.config.get('send_buffer_bytes', 1048576),
+            'receive_buffer_bytes': self.config.get('receive_buffer_bytes', 1048576),
         }
+        
+        # Idempotence keeps per-partition ordering with 5 requests in flight
+        # and makes retries safe; the 'idempotent' config key turns it off
+        if self.config.get('idempotent', True):
+            producer_config.update({
+                'enable_idempotence': True,
+                'retries': IDEMPOTENT_RETRIES,
+            })
+        
+        return producer_config
     
     def _get_consumer_config(self, topic: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -90,7 +123,7 @@ class SimpleKafkaUtility:
             Dictionary containing consumer configuration
         """
         return {
-            'bootstrap_servers': self.config['bootstrap_servers'].split(','),
+            'bootstrap_servers': self._bootstrap_servers,
             'group_id': self.config['consumer_group_id'],
             'auto_offset_reset': self.config['auto_offset_reset'],
             'enable_auto_commit': True,
@@ -98,16 +131,25 @@ class SimpleKafkaUtility:
             'max_poll_records': self.config['max_poll_records'],
             'session_timeout_ms': self.config['session_timeout_ms'],
             'heartbeat_interval_ms': self.config['heartbeat_interval_ms'],
-            'value_deserializer': lambda v: json.loads(v.decode('utf-8')) if v else None,
-            'key_deserializer': lambda k: k.decode('utf-8') if k else None,
+            # Lets `for record in consumer` end once the topic is idle
+            'consumer_timeout_ms': self.config.get('consumer_timeout_ms', 1000),
+            'fetch_max_bytes': self.config.get('fetch_max_bytes', 52428800),
+            'max_partition_fetch_bytes': self.config.get('max_partition_fetch_bytes', 4194304),
+            'receive_buffer_bytes': self.config.get('receive_buffer_bytes', 1048576),
+            # Values are decoded per polled batch in iter_messages
+            'key_deserializer': deserialize_key,
         }
     
     def get_producer(self, topic: Optional[str] = None) -> KafkaProducer:
         """
-        Get or create a Kafka producer for the specified topic.
+        Get or create the Kafka producer.
+        
+        A single producer is shared by all topics: it multiplexes every topic
+        over the same broker connections, so one instance per topic would only
+        add bootstrap, metadata and socket overhead.
         
         Args:
-            topic: Optional topic name (uses default if not provided)
+            topic: Unused, kept for backward compatibility
             
         Returns:
             KafkaProducer instance
@@ -115,158 +157,258 @@ class SimpleKafkaUtility:
         Raises:
             SimpleKafkaError: If producer creation fails
         """
-        topic = topic or self.config['topic']
-        
-        if topic not in self._producers:
+        if self._producer is None:
             try:
                 producer_config = self._get_producer_config()
-                self._producers[topic] = KafkaProducer(**producer_config)
-                self.logger.info(f"Created producer for topic: {topic}")
+                self._producer = KafkaProducer(**producer_config)
+                self.logger.info("Created producer")
             except Exception as e:
-                raise SimpleKafkaError(f"Failed to create producer for topic {topic}: {str(e)}")
+                raise SimpleKafkaError(f"Failed to create producer: {str(e)}")
         
-        return self._producers[topic]
+        return self._producer
     
     def get_consumer(self, topic: Optional[str] = None) -> KafkaConsumer:
         """
         Get or create a Kafka consumer for the specified topic.
         
+        As with KafkaKerberosUtility.get_consumer, record values are left as
+        raw JSON bytes (see kafka_common.iter_batches) and keys are decoded to str.
+        
         Args:
             topic: Optional topic name (uses default if not provided)
             
         Returns:
-            KafkaConsumer instance
+            KafkaConsumer instance yielding records with raw bytes values
             
         Raises:
             SimpleKafkaError: If consumer creation fails
         """
-        topic = topic or self.config['topic']
+        topic = topic or self._default_topic
         
-        if topic not in self._consumers:
+        consumer = self._consumers.get(topic)
+        if consumer is None:
             try:
                 consumer_config = self._get_consumer_config(topic)
-                consumer = KafkaConsumer(topic, **consumer_config)
-                self._consumers[topic] = consumer
+                consumer = self._consumers[topic] = KafkaConsumer(topic, **consumer_config)
                 self.logger.info(f"Created consumer for topic: {topic}")
             except Exception as e:
                 raise SimpleKafkaError(f"Failed to create consumer for topic {topic}: {str(e)}")
         
-        return self._consumers[topic]
+        return consumer
     
-    def produce_message(self, message: Any, key: Optional[str] = None, 
-                       topic: Optional[str] = None) -> bool:
+    def produce_message(self, message: Any, key: Optional[Union[str, bytes]] = None, 
+                       topic: Optional[str] = None, wait: bool = True,
+                       return_metadata: bool = False) -> Union[bool, Any, Future]:
         """
         Produce a message to Kafka.
         
         Args:
-            message: Message to produce (will be JSON serialized)
-            key: Optional message key
+            message: Message to produce (JSON serialized; bytes are sent as pre-encoded JSON)
+            key: Optional message key (str or bytes)
             topic: Optional topic name (uses default if not provided)
+            wait: Block until the broker acknowledges the message; when False the
+                message is queued, delivery is logged by callbacks and the send
+                future is returned (call flush() to wait for pending messages)
+            return_metadata: Return the broker's record metadata instead of True;
+                when False the acknowledgement is only waited for, not inspected
             
         Returns:
-            True if message was sent successfully, False otherwise
+            True if message was sent successfully, the record metadata when
+            return_metadata is True, or the send future when wait is False
             
         Raises:
             SimpleKafkaError: If message production fails
         """
-        topic = topic or self.config['topic']
+        topic = topic or self._default_topic
         
         try:
             producer = self.get_producer(topic)
             
             future = producer.send(topic, value=message, key=key)
+            
+            if not wait:
+                future.add_callback(self._on_send_success)
+                future.add_errback(self._on_send_error, topic)
+                return future
+            
+            # Waiting raises on delivery failure, which is all a boolean caller needs
+            if not return_metadata:
+                future.get(timeout=10)
+                return True
+            
             record_metadata = future.get(timeout=10)
             
-            self.logger.info(
-                f"Message sent successfully to topic {record_metadata.topic} "
-                f"partition {record_metadata.partition} offset {record_metadata.offset}"
-            )
+            self._on_send_success(record_metadata)
             
-            return True
+            return record_metadata
             
         except Exception as e:
             self.logger.error(f"Failed to produce message to topic {topic}: {str(e)}")
             raise SimpleKafkaError(f"Message production failed: {str(e)}")
     
-    def consume_messages(self, topic: Optional[str] = None, 
-                        message_handler: Optional[Callable] = None,
-                        max_messages: Optional[int] = None,
-                        timeout_ms: int = 1000) -> List[Any]:
+    def _on_send_success(self, record_metadata):
+        """Log a delivered message."""
+        self.logger.debug(
+            "Message sent successfully to topic %s partition %d offset %d",
+            record_metadata.topic, record_metadata.partition, record_metadata.offset
+        )
+    
+    def _on_send_error(self, topic: str, exc: Exception):
+        """Log a failed asynchronous delivery."""
+        self.logger.error(f"Failed to deliver message to topic {topic}: {str(exc)}")
+    
+    def flush(self, timeout: Optional[float] = None):
         """
-        Consume messages from Kafka.
+        Block until all pending messages have been sent.
         
         Args:
+            timeout: Optional timeout in seconds
+            
+        Raises:
+            SimpleKafkaError: If flushing fails or times out
+        """
+        if self._producer is None:
+            return
+        
+        try:
+            self._producer.flush(timeout)
+        except Exception as e:
+            raise SimpleKafkaError(f"Failed to flush producer: {str(e)}")
+    
+    def produce_messages(self, messages: List[Any],
+                         keys: Optional[List[Optional[Union[str, bytes]]]] = None,
+                         topic: Optional[str] = None) -> int:
+        """
+        Produce a batch of messages to Kafka with a single flush.
+        
+        All messages are queued without blocking so the producer can group them
+        into batched requests, then the producer is flushed once.
+        
+        Args:
+            messages: Messages to produce (each JSON serialized; bytes are sent as-is)
+            keys: Optional message keys, one per message
             topic: Optional topic name (uses default if not provided)
-            message_handler: Optional callback function to process each message
+            
+        Returns:
+            Number of messages delivered successfully
+            
+        Raises:
+            SimpleKafkaError: If any message fails to be delivered
+        """
+        topic = topic or self._default_topic
+        
+        if keys is None:
+            keys = [None] * len(messages)
+        elif len(keys) != len(messages):
+            raise SimpleKafkaError("Number of keys must match number of messages")
+        
+        try:
+            producer = self.get_producer(topic)
+            send = producer.send
+            
+            futures = [send(topic, value=message, key=key)
+                       for message, key in zip(messages, keys)]
+            producer.flush()
+            
+        except Exception as e:
+            self.logger.error(f"Failed to produce messages to topic {topic}: {str(e)}")
+            raise SimpleKafkaError(f"Batch message production failed: {str(e)}")
+        
+        failed = [future for future in futures if future.failed()]
+        if failed:
+            raise SimpleKafkaError(
+                f"Failed to deliver {len(failed)} of {len(futures)} messages to topic {topic}: "
+                f"{str(failed[0].exception)}"
+            )
+        
+        self.logger.info(f"Sent {len(futures)} messages to topic {topic}")
+        
+        return len(futures)
+    
+    def iter_messages(self, topic: Optional[str] = None,
+                      message_handler: Optional[Callable] = None,
+                      max_messages: Optional[int] = None,
+                      timeout_ms: int = 1000) -> Iterator[Any]:
+        """
+        Consume messages from Kafka as a stream.
+        
+        Messages are yielded one at a time instead of being collected, so memory
+        stays constant however many messages are consumed.
+        
+        Args:
+            topic: Optional topic name (uses default if not provided)
+            message_handler: Optional callback function to process each message,
+                called with the decoded message and the raw record
             max_messages: Optional maximum number of messages to consume
             timeout_ms: Timeout for polling messages in milliseconds
             
-        Returns:
-            List of consumed messages
+        Yields:
+            Consumed messages
             
         Raises:
             SimpleKafkaError: If message consumption fails
         """
-        topic = topic or self.config['topic']
-        messages = []
+        topic = topic or self._default_topic
         
         try:
             consumer = self.get_consumer(topic)
+            poll = functools.partial(consumer.poll, timeout_ms=timeout_ms)
             
-            message_count = 0
-            while True:
-                if max_messages and message_count >= max_messages:
-                    break
-                
-                message_batch = consumer.poll(timeout_ms=timeout_ms)
-                
-                for tp, records in message_batch.items():
-                    for record in records:
-                        message = record.value
-                        messages.append(message)
-                        message_count += 1
-                        
-                        self.logger.info(
-                            f"Received message from topic {record.topic} "
-                            f"partition {record.partition} offset {record.offset}: {message}"
-                        )
-                        
-                        if message_handler:
-                            try:
-                                message_handler(message, record)
-                            except Exception as e:
-                                self.logger.error(f"Message handler error: {str(e)}")
-                        
-                        if max_messages and message_count >= max_messages:
-                            break
-                
-                if not message_batch:
-                    break
-            
-            return messages
+            for records, values in iter_batches(poll, max_messages, self.config['max_poll_records']):
+                for record, message in zip(records, values):
+                    self.logger.debug(
+                        "Received message from topic %s partition %d offset %d: %s",
+                        record.topic, record.partition, record.offset, message
+                    )
+                    
+                    if message_handler:
+                        try:
+                            message_handler(message, record)
+                        except Exception as e:
+                            self.logger.error(f"Message handler error: {str(e)}")
+                    
+                    yield message
             
         except Exception as e:
             self.logger.error(f"Failed to consume messages from topic {topic}: {str(e)}")
             raise SimpleKafkaError(f"Message consumption failed: {str(e)}")
     
-    def close(self):
-        """Close all producers and consumers."""
-        try:
-            # Close producers
-            for topic, producer in self._producers.items():
-                producer.close()
-                self.logger.info(f"Closed producer for topic: {topic}")
-            
-            # Close consumers
-            for topic, consumer in self._consumers.items():
-                consumer.close()
-                self.logger.info(f"Closed consumer for topic: {topic}")
+    def consume_messages(self, topic: Optional[str] = None, 
+                        message_handler: Optional[Callable] = None,
+                        max_messages: Optional[int] = None,
+                        timeout_ms: int = 1000) -> List[Any]:
+        """
+        Consume messages from Kafka.
+        
+        Args:
+            topic: Optional topic name (uses default if not provided)
+            message_handler: Optional callback function to process each message
+            max_messages: Optional maximum number of messages to consume
+            timeout_ms: Timeout for polling messages in milliseconds
             
-            self._producers.clear()
-            self._consumers.clear()
+        Returns:
+            List of consumed messages
             
-        except Exception as e:
-            self.logger.error(f"Error closing connections: {str(e)}")
+        Raises:
+            SimpleKafkaError: If message consumption fails
+        """
+        return list(self.iter_messages(topic, message_handler, max_messages, timeout_ms))
+    
+    def close(self):
+        """
+        Close the producer and all consumers.
+        
+        Clients are closed concurrently by close_clients; the producer delivers
+        its pending messages first.
+        """
+        clients = [('consumer', f'consumer for topic: {topic}', consumer)
+                   for topic, consumer in self._consumers.items()]
+        if self._producer is not None:
+            clients.append(('producer', 'producer', self._producer))
+        close_clients(clients, self.logger)
+        
+        self._producer = None
+        self._consumers.clear()
     
     def __enter__(self):
         """Context manager entry."""
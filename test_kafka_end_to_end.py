@@ -18,6 +18,29 @@ from kafka_kerberos_utility import KafkaKerberosUtility, KafkaKerberosError
 from simple_kafka_utility import SimpleKafkaUtility, SimpleKafkaError
 
 
+def consume_until(kafka, expected, timeout=10.0):
+    """
+    Poll for messages until the expected number arrived or the timeout elapsed.
+    
+    Args:
+        kafka: Kafka utility to consume from
+        expected: Number of messages to wait for
+        timeout: Maximum time to wait in seconds
+        
+    Returns:
+        List of consumed messages
+    """
+    messages = []
+    deadline = time.monotonic() + timeout
+    
+    while len(messages) < expected and time.monotonic() < deadline:
+        messages.extend(
+            kafka.consume_messages(max_messages=expected - len(messages), timeout_ms=500)
+        )
+    
+    return messages
+
+
 def test_simple_kafka():
     """Test Kafka without Kerberos authentication."""
     print("🧪 Testing Simple Kafka (No Kerberos)")
@@ -33,6 +56,10 @@ def test_simple_kafka():
             'max_poll_records': 500,
             'session_timeout_ms': 30000,
             'heartbeat_interval_ms': 3000,
+            'linger_ms': 100,
+            'batch_size': 65536,
+            'compression_type': 'lz4',
+            'log_file': 'simple_kafka_utility.log',
         }
         
         # Test the utility
@@ -46,20 +73,15 @@ def test_simple_kafka():
                 {"id": 3, "message": "End-to-end test", "timestamp": time.time()},
             ]
             
-            for i, message in enumerate(test_messages):
-                success = kafka.produce_message(message, key=f"test_key_{i}")
-                if success:
-                    print(f"✅ Message {i+1} produced successfully")
-                else:
-                    print(f"❌ Failed to produce message {i+1}")
+            sent = kafka.produce_messages(
+                test_messages, keys=[f"test_key_{i}".encode() for i in range(len(test_messages))]
+            )
+            print(f"✅ {sent} messages produced successfully")
             
-            # Wait a moment for messages to be available
-            print("\n⏳ Waiting for messages to be available...")
-            time.sleep(2)
-            
-            # Consume messages
-            print("📥 Consuming messages...")
-            messages = kafka.consume_messages(max_messages=5, timeout_ms=10000)
+            # Consume messages; produce_messages already flushed, so poll until
+            # they arrive instead of sleeping a fixed time
+            print("\n📥 Consuming messages...")
+            messages = consume_until(kafka, len(test_messages))
             
             print(f"✅ Consumed {len(messages)} messages:")
             for i, msg in enumerate(messages):
@@ -91,25 +113,20 @@ def test_kerberos_kafka():
                 {"id": 3, "message": "Secure end-to-end test", "timestamp": time.time()},
             ]
             
-            for i, message in enumerate(test_messages):
-                try:
-                    success = kafka.produce_message(message, key=f"kerberos_key_{i}")
-                    if success:
-                        print(f"✅ Message {i+1} produced successfully with Kerberos")
-                    else:
-                        print(f"❌ Failed to produce message {i+1} with Kerberos")
-                except Exception as e:
-                    print(f"⚠️  Kerberos production failed (expected if Kafka doesn't support Kerberos): {e}")
-                    return False
-            
-            # Wait a moment for messages to be available
-            print("\n⏳ Waiting for messages to be available...")
-            time.sleep(2)
+            try:
+                sent = kafka.produce_messages(
+                    test_messages, keys=[f"kerberos_key_{i}".encode() for i in range(len(test_messages))]
+                )
+                print(f"✅ {sent} messages produced successfully with Kerberos")
+            except Exception as e:
+                print(f"⚠️  Kerberos production failed (expected if Kafka doesn't support Kerberos): {e}")
+                return False
             
-            # Consume messages
-            print("📥 Consuming messages with Kerberos...")
+            # Consume messages; produce_messages already flushed, so poll until
+            # they arrive instead of sleeping a fixed time
+            print("\n📥 Consuming messages with Kerberos...")
             try:
-                messages = kafka.consume_messages(max_messages=5, timeout_ms=10000)
+                messages = consume_until(kafka, len(test_messages))
                 print(f"✅ Consumed {len(messages)} messages with Kerberos:")
                 for i, msg in enumerate(messages):
                     print(f"   Message {i+1}: {msg}")
@@ -17,7 +17,10 @@ import os
 import time
 import json
 import subprocess
+from contextlib import nullcontext
+from typing import Optional
 from kafka_kerberos_utility import KafkaKerberosUtility, KafkaKerberosError
+from test_kerberos_setup import GSSAPI_AVAILABLE, gssapi_ticket_status
 
 
 def test_kerberos_ticket():
@@ -25,6 +28,13 @@ def test_kerberos_ticket():
     print("🔐 Testing Kerberos Ticket")
     print("-" * 40)
     
+    if GSSAPI_AVAILABLE:
+        ticket_ok, status = gssapi_ticket_status()
+        print(f"{'✅' if ticket_ok else '❌'} {status}")
+        if not ticket_ok:
+            print("   Run: kinit -kt test-user.keytab test-user")
+        return ticket_ok
+    
     try:
         # Check if klist is available
         result = subprocess.run(['klist'], capture_output=True, text=True)
@@ -41,14 +51,26 @@ def test_kerberos_ticket():
         return False
 
 
-def test_kerberos_authentication():
+def open_utility(kafka: Optional[KafkaKerberosUtility] = None):
+    """
+    Return a context manager yielding the Kafka utility.
+    
+    A shared utility passed in by main() is reused as is and left open;
+    otherwise a new one is opened from the test configuration.
+    """
+    if kafka is not None:
+        return nullcontext(kafka)
+    return KafkaKerberosUtility(config_file="test_kafka_config.ini")
+
+
+def test_kerberos_authentication(kafka: Optional[KafkaKerberosUtility] = None):
     """Test Kerberos authentication with Kafka utility."""
     print("\n🔐 Testing Kerberos Authentication with Kafka")
     print("=" * 50)
     
     try:
         # Test with Kerberos configuration
-        with KafkaKerberosUtility(config_file="test_kafka_config.ini") as kafka:
+        with open_utility(kafka) as kafka:
             print("✅ Kafka utility initialized with Kerberos configuration")
             
             # Test configuration
@@ -73,13 +95,13 @@ def test_kerberos_authentication():
         return False
 
 
-def test_kerberos_message_flow():
+def test_kerberos_message_flow(kafka: Optional[KafkaKerberosUtility] = None):
     """Test message production and consumption with Kerberos."""
     print("\n📤 Testing Kerberos Message Flow")
     print("=" * 40)
     
     try:
-        with KafkaKerberosUtility(config_file="test_kafka_config.ini") as kafka:
+        with open_utility(kafka) as kafka:
             # Test message production
             test_message = {
                 "id": 1,
@@ -141,20 +163,31 @@ def test_kerberos_environment():
         else:
             print(f"   ⚠️  {var}: Not set")
     
-    # Check keytab file
-    keytab_path = "/home/eon/projects/Kafka-Python/test-user.keytab"
-    if os.path.exists(keytab_path):
+    # Check keytab file; a single stat both tests existence and reads permissions
+    keytab_path = env_vars['KRB5_KTNAME'] or os.environ.get('KAFKA_KEYTAB_PATH') or "test-user.keytab"
+    # KRB5_KTNAME may name the keytab type, as in FILE:/path/to/user.keytab
+    for prefix in ('FILE:', 'WRFILE:'):
+        if keytab_path.startswith(prefix):
+            keytab_path = keytab_path[len(prefix):]
+            break
+    try:
+        keytab_stat = os.stat(keytab_path)
         print(f"   ✅ Keytab file exists: {keytab_path}")
-        print(f"   ✅ Keytab permissions: {oct(os.stat(keytab_path).st_mode)[-3:]}")
-    else:
+        print(f"   ✅ Keytab permissions: {oct(keytab_stat.st_mode)[-3:]}")
+    except FileNotFoundError:
         print(f"   ❌ Keytab file not found: {keytab_path}")
+    except OSError as e:
+        print(f"   ❌ Keytab file not accessible: {keytab_path} ({e.strerror})")
     
     # Check krb5.conf
-    krb5_conf = "/etc/krb5.conf"
-    if os.path.exists(krb5_conf):
+    krb5_conf = env_vars['KRB5_CONFIG'] or "/etc/krb5.conf"
+    try:
+        os.stat(krb5_conf)
         print(f"   ✅ krb5.conf exists: {krb5_conf}")
-    else:
+    except FileNotFoundError:
         print(f"   ❌ krb5.conf not found: {krb5_conf}")
+    except OSError as e:
+        print(f"   ❌ krb5.conf not accessible: {krb5_conf} ({e.strerror})")
     
     return True
 
@@ -175,13 +208,22 @@ def main():
     print("\n2️⃣ Testing Kerberos Environment")
     results.append(("Kerberos Environment", test_kerberos_environment()))
     
-    # Test 3: Kerberos authentication
-    print("\n3️⃣ Testing Kerberos Authentication")
-    results.append(("Kerberos Authentication", test_kerberos_authentication()))
+    # Share one utility between the Kafka tests, so the configuration and
+    # Kerberos setup, producer and consumer are only created once
+    try:
+        kafka = KafkaKerberosUtility(config_file="test_kafka_config.ini")
+    except Exception as e:
+        print(f"\n❌ Failed to initialize Kafka utility: {e}")
+        kafka = None
     
-    # Test 4: Kerberos message flow
-    print("\n4️⃣ Testing Kerberos Message Flow")
-    results.append(("Kerberos Message Flow", test_kerberos_message_flow()))
+    with kafka if kafka is not None else nullcontext():
+        # Test 3: Kerberos authentication
+        print("\n3️⃣ Testing Kerberos Authentication")
+        results.append(("Kerberos Authentication", test_kerberos_authentication(kafka)))
+        
+        # Test 4: Kerberos message flow
+        print("\n4️⃣ Testing Kerberos Message Flow")
+        results.append(("Kerberos Message Flow", test_kerberos_message_flow(kafka)))
     
     # Summary
     print("\n" + "=" * 60)
@@ -13,36 +13,174 @@ without requiring actual Kafka connectivity.
 """
 
 import os
+import re
 import sys
+import copy
+import atexit
+import json
+import shutil
+import logging
+import functools
 import tempfile
 import unittest
-from unittest.mock import patch, MagicMock
-
-# Add the current directory to the path to import the utility
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import configparser
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
+from unittest.mock import patch, MagicMock, AsyncMock
 
+# The utility is importable when run from the repository root (python test_utility.py,
+# python -m unittest); under pytest, conftest.py puts the repository on sys.path
+import kafka_common
+import kafka_kerberos_utility
+import simple_kafka_utility
+from kafka.errors import KafkaError, KafkaTimeoutError
 from kafka_kerberos_utility import KafkaKerberosUtility, KafkaKerberosError
+from kafka_confluent_backend import ConfluentProducer, DeliveryReport
+from simple_kafka_utility import SimpleKafkaUtility, SimpleKafkaError
+
+
+# Test files live on tmpfs (RAM) where available, keeping disk I/O out of the suite
+_TEMP_BASE = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+
+
+def _write_keytab() -> str:
+    """
+    Write the dummy keytab shared by all tests and return its path.
+    
+    The directory is removed at interpreter exit, which also covers the
+    second copy of this module imported when run_tests() runs pytest.
+    """
+    keytab_dir = tempfile.mkdtemp(dir=_TEMP_BASE)
+    atexit.register(shutil.rmtree, keytab_dir, True)
+    keytab_path = os.path.join(keytab_dir, "test.keytab")
+    Path(keytab_path).write_text("dummy keytab content")
+    return keytab_path
+
+
+# The keytab content never changes, so one file serves the whole module
+_KEYTAB_PATH = _write_keytab()
+
+
+# Environments shared by the tests; read-only so no test can leak changes into another
+_ENV_MINIMAL = MappingProxyType({
+    'KAFKA_BOOTSTRAP_SERVERS': 'localhost:9092',
+    'KAFKA_TOPIC': 'test-topic',
+    'KAFKA_KEYTAB_PATH': _KEYTAB_PATH,
+    'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM'
+})
+_ENV_FULL = MappingProxyType({
+    'KAFKA_BOOTSTRAP_SERVERS': 'broker1:9092,broker2:9092',
+    'KAFKA_TOPIC': 'env-topic',
+    'KAFKA_KEYTAB_PATH': _KEYTAB_PATH,
+    'KAFKA_PRINCIPAL': 'env@EXAMPLE.COM',
+    'KAFKA_SERVICE_NAME': 'env-kafka',
+    'KAFKA_CONSUMER_GROUP_ID': 'env-group'
+})
+_ENV_FILE_OVERRIDE = MappingProxyType({
+    'KAFKA_BOOTSTRAP_SERVERS': 'env-broker:9092',
+    'KAFKA_TOPIC': 'env-topic',
+    'KAFKA_KEYTAB_PATH': _KEYTAB_PATH,
+    'KAFKA_PRINCIPAL': 'env@EXAMPLE.COM'
+})
+
+
+# (environment, expected error) pairs for the negative-path validation test
+VALIDATION_CASES = [
+    # Nothing configured
+    ({}, "Missing required configuration parameters"),
+    # Keytab path does not exist
+    ({
+        'KAFKA_BOOTSTRAP_SERVERS': 'localhost:9092',
+        'KAFKA_TOPIC': 'test-topic',
+        'KAFKA_KEYTAB_PATH': '/nonexistent/keytab',
+        'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM'
+    }, "Keytab file not found"),
+    # Empty bootstrap servers count as missing
+    ({
+        'KAFKA_BOOTSTRAP_SERVERS': '',
+        'KAFKA_TOPIC': 'test-topic',
+        'KAFKA_KEYTAB_PATH': _KEYTAB_PATH,
+        'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM'
+    }, "Missing required configuration parameters"),
+    # Non-numeric value for a numeric setting
+    ({
+        'KAFKA_BOOTSTRAP_SERVERS': 'localhost:9092',
+        'KAFKA_TOPIC': 'test-topic',
+        'KAFKA_KEYTAB_PATH': _KEYTAB_PATH,
+        'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM',
+        'KAFKA_MAX_POLL_RECORDS': 'many'
+    }, "Invalid configuration value"),
+]
+
+
+# Single-pass parse of the [kafka] section, checked against the ConfigParser loader
+_INI_KAFKA_SECTION = re.compile(r'(?ms)^\[kafka\][ \t]*$(.*?)(?=^\[|\Z)')
+_INI_OPTION = re.compile(r'(?m)^(\w+)[ \t]*[=:][ \t]*(.*?)[ \t]*$')
+
+
+def _regex_read_config_file(path: str, mtime_ns: int):
+    """Drop-in for kafka_kerberos_utility._read_config_file using the regexes above."""
+    with open(path) as f:
+        section = _INI_KAFKA_SECTION.search(f.read())
+    if section is None:
+        return ()
+    return tuple((key.lower(), value) for key, value in _INI_OPTION.findall(section.group(1)))
+
+
+@contextmanager
+def fast_env(env):
+    """
+    Run the block with os.environ replaced by a plain dict holding only env.
+    
+    Swapping the mapping is cheaper than patch.dict(os.environ, clear=True),
+    which copies the whole process environment and calls putenv/unsetenv for
+    every key on entry and exit.
+    """
+    saved = kafka_kerberos_utility.os.environ
+    kafka_kerberos_utility.os.environ = dict(env)
+    try:
+        yield
+    finally:
+        kafka_kerberos_utility.os.environ = saved
+
+
+@functools.lru_cache(maxsize=None)
+def _build_utility(env_items: frozenset, config_file: Optional[str]) -> KafkaKerberosUtility:
+    """Build a utility once per environment and config file."""
+    with fast_env(dict(env_items)):
+        return KafkaKerberosUtility(config_file=config_file)
+
+
+def cached_utility(env, config_file: Optional[str] = None) -> KafkaKerberosUtility:
+    """
+    Return a shallow copy of a utility built once for env and config_file.
+    
+    The copy shares its configuration and client caches with the cached
+    instance, so use it only in tests that inspect the configuration.
+    """
+    return copy.copy(_build_utility(frozenset(env.items()), config_file))
 
 
 class TestKafkaKerberosUtility(unittest.TestCase):
     """Test cases for KafkaKerberosUtility class."""
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up test environment."""
-        # Create temporary files for testing
-        self.temp_dir = tempfile.mkdtemp()
-        self.keytab_path = os.path.join(self.temp_dir, "test.keytab")
-        self.config_path = os.path.join(self.temp_dir, "test_config.ini")
-        
-        # Create a dummy keytab file
-        with open(self.keytab_path, 'w') as f:
-            f.write("dummy keytab content")
+        # The config file is a read-only input, so it is written once for the whole class
+        cls.temp_dir = tempfile.mkdtemp(dir=_TEMP_BASE)
+        cls.keytab_path = _KEYTAB_PATH
+        cls.config_path = os.path.join(cls.temp_dir, "test_config.ini")
         
         # Create a test config file
         config_content = f"""[kafka]
 bootstrap_servers = localhost:9092
 topic = test-topic
-keytab_path = {self.keytab_path}
+keytab_path = {cls.keytab_path}
 principal = test@EXAMPLE.COM
 service_name = kafka
 consumer_group_id = test-group
@@ -51,146 +189,274 @@ max_poll_records = 500
 session_timeout_ms = 30000
 heartbeat_interval_ms = 3000
 """
-        with open(self.config_path, 'w') as f:
-            f.write(config_content)
+        Path(cls.config_path).write_text(config_content)
+        
+        # Client classes are patched once for the whole class; setUp resets the mocks
+        cls._producer_patcher = patch('kafka_kerberos_utility.KafkaProducer')
+        cls._consumer_patcher = patch('kafka_kerberos_utility.KafkaConsumer')
+        cls.mock_producer = cls._producer_patcher.start()
+        cls.mock_consumer = cls._consumer_patcher.start()
+        
+        # No test should wait on a retry or backoff; the utility does not import time
+        # itself, so the patch covers sleeps in anything it calls
+        cls._sleep_patcher = patch('time.sleep')
+        cls._sleep_patcher.start()
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up test environment."""
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        cls._producer_patcher.stop()
+        cls._consumer_patcher.stop()
+        cls._sleep_patcher.stop()
+        
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
     
-    def test_config_loading_from_file(self):
-        """Test configuration loading from file."""
-        with patch.dict(os.environ, {}, clear=True):
-            utility = KafkaKerberosUtility(config_file=self.config_path)
+    def setUp(self):
+        """Reset the shared client mocks."""
+        self.mock_producer.reset_mock(return_value=True, side_effect=True)
+        self.mock_consumer.reset_mock(return_value=True, side_effect=True)
+    
+    def _expect_error(self, callable_, substring: str):
+        """
+        Assert callable_() raises KafkaKerberosError with substring in its message.
+        """
+        try:
+            callable_()
+        except KafkaKerberosError as e:
+            message = e.args[0]
+        else:
+            self.fail(f"KafkaKerberosError not raised (expected '{substring}')")
+        self.assertIn(substring, message)
+    
+    def test_config_loading(self):
+        """Test configuration loading from a config file and from environment variables."""
+        # (source, environment, config file, expected configuration values)
+        cases = [
+            ("file", {}, self.config_path, {
+                'bootstrap_servers': ['localhost:9092'],
+                'topic': 'test-topic',
+                'keytab_path': self.keytab_path,
+                'principal': 'test@EXAMPLE.COM',
+                'service_name': 'kafka',
+                'consumer_group_id': 'test-group',
+                'max_poll_records': 500,
+                'session_timeout_ms': 30000,
+            }),
+            ("env", _ENV_FULL, None, {
+                'bootstrap_servers': ['broker1:9092', 'broker2:9092'],
+                'topic': 'env-topic',
+                'keytab_path': self.keytab_path,
+                'principal': 'env@EXAMPLE.COM',
+                'service_name': 'env-kafka',
+                'consumer_group_id': 'env-group',
+            }),
+        ]
+        
+        for source, env, config_file, expected in cases:
+            with self.subTest(source=source):
+                utility = cached_utility(env, config_file)
+                for key, value in expected.items():
+                    self.assertEqual(utility.config[key], value, key)
+    
+    def test_config_file_parse_cached(self):
+        """Test an unchanged config file is parsed once and re-parsed after a change."""
+        with fast_env({}), \
+                patch('kafka_kerberos_utility.configparser.ConfigParser',
+                      wraps=configparser.ConfigParser) as mock_parser:
+            kafka_kerberos_utility._read_config_file.cache_clear()
+            KafkaKerberosUtility(config_file=self.config_path)
+            KafkaKerberosUtility(config_file=self.config_path)
+            self.assertEqual(mock_parser.call_count, 1)
             
-            self.assertEqual(utility.config['bootstrap_servers'], 'localhost:9092')
+            stat_result = os.stat(self.config_path)
+            os.utime(self.config_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1))
+            utility = KafkaKerberosUtility(config_file=self.config_path)
+            self.assertEqual(mock_parser.call_count, 2)
             self.assertEqual(utility.config['topic'], 'test-topic')
-            self.assertEqual(utility.config['keytab_path'], self.keytab_path)
-            self.assertEqual(utility.config['principal'], 'test@EXAMPLE.COM')
-            self.assertEqual(utility.config['service_name'], 'kafka')
-            self.assertEqual(utility.config['consumer_group_id'], 'test-group')
     
-    def test_config_loading_from_env(self):
-        """Test configuration loading from environment variables."""
-        env_vars = {
-            'KAFKA_BOOTSTRAP_SERVERS': 'broker1:9092,broker2:9092',
-            'KAFKA_TOPIC': 'env-topic',
-            'KAFKA_KEYTAB_PATH': self.keytab_path,
-            'KAFKA_PRINCIPAL': 'env@EXAMPLE.COM',
-            'KAFKA_SERVICE_NAME': 'env-kafka',
-            'KAFKA_CONSUMER_GROUP_ID': 'env-group'
-        }
+    def test_config_file_regex_parse_equivalent(self):
+        """Test a single-pass regex parse of the config file matches ConfigParser."""
+        mtime_ns = os.stat(self.config_path).st_mtime_ns
+        self.assertEqual(
+            _regex_read_config_file(self.config_path, mtime_ns),
+            kafka_kerberos_utility._read_config_file.__wrapped__(self.config_path, mtime_ns)
+        )
         
-        with patch.dict(os.environ, env_vars, clear=True):
-            utility = KafkaKerberosUtility()
-            
-            self.assertEqual(utility.config['bootstrap_servers'], 'broker1:9092,broker2:9092')
-            self.assertEqual(utility.config['topic'], 'env-topic')
-            self.assertEqual(utility.config['keytab_path'], self.keytab_path)
-            self.assertEqual(utility.config['principal'], 'env@EXAMPLE.COM')
-            self.assertEqual(utility.config['service_name'], 'env-kafka')
-            self.assertEqual(utility.config['consumer_group_id'], 'env-group')
+        # The rest of the loading logic gives the same configuration on top of either parse
+        with fast_env({}), \
+                patch('kafka_kerberos_utility._read_config_file', _regex_read_config_file):
+            utility = KafkaKerberosUtility(config_file=self.config_path)
+        self.assertEqual(utility.config, cached_utility({}, self.config_path).config)
     
     def test_env_overrides_file(self):
         """Test that environment variables override config file values."""
-        env_vars = {
-            'KAFKA_BOOTSTRAP_SERVERS': 'env-broker:9092',
-            'KAFKA_TOPIC': 'env-topic',
-            'KAFKA_KEYTAB_PATH': self.keytab_path,
-            'KAFKA_PRINCIPAL': 'env@EXAMPLE.COM'
-        }
+        utility = cached_utility(_ENV_FILE_OVERRIDE, self.config_path)
         
-        with patch.dict(os.environ, env_vars, clear=True):
-            utility = KafkaKerberosUtility(config_file=self.config_path)
-            
-            # Environment variables should override config file
-            self.assertEqual(utility.config['bootstrap_servers'], 'env-broker:9092')
-            self.assertEqual(utility.config['topic'], 'env-topic')
-            self.assertEqual(utility.config['principal'], 'env@EXAMPLE.COM')
-            
-            # Values not in env should come from config file
-            self.assertEqual(utility.config['service_name'], 'kafka')
-            # Note: consumer_group_id has a default value in environment, so it won't be overridden
+        # Environment variables should override config file
+        self.assertEqual(utility.config['bootstrap_servers'], ['env-broker:9092'])
+        self.assertEqual(utility.config['topic'], 'env-topic')
+        self.assertEqual(utility.config['principal'], 'env@EXAMPLE.COM')
+        
+        # Values not in env should come from config file
+        self.assertEqual(utility.config['service_name'], 'kafka')
+        # Note: consumer_group_id has a default value in environment, so it won't be overridden
+    
+    def test_json_codec_matches_stdlib(self):
+        """Test values encode to the same JSON as the json module, with or without orjson."""
+        for value in ({"id": 1, "action": "login"}, {1: 'a', 2.5: 'b', None: 'c'}, {"big": 2**70}):
+            with self.subTest(value=value):
+                self.assertEqual(json.loads(kafka_common.serialize_value(value)),
+                                 json.loads(json.dumps(value)))
+        
+        # orjson rejects integers wider than 64 bits; encoding falls back to json
+        self.assertEqual(kafka_common.serialize_value([2**70]), b'[1180591620717411303424]')
+        
+        # Both encoders reject the same values: non-finite floats and non-JSON types
+        for dumps in (kafka_common._dumps, kafka_common._json_dumps):
+            for value, error in (({"not": object()}, TypeError),
+                                 ({"at": datetime(2025, 8, 15)}, TypeError),
+                                 ({datetime(2025, 8, 15): 1}, TypeError),
+                                 ({"nan": float('nan')}, ValueError),
+                                 ([float('-inf')], ValueError)):
+                with self.subTest(dumps=dumps.__name__, value=value), self.assertRaises(error):
+                    dumps(value)
+    
+    def test_iter_batches_limits_records(self):
+        """Test the shared poll loop requests, cuts and decodes only the records still needed."""
+        records = [MagicMock(value=json.dumps(i).encode()) for i in range(5)]
+        poll = MagicMock(side_effect=[{'tp0': records[:2], 'tp1': records[2:4]}, {'tp0': records[4:]}])
+        
+        batches = list(kafka_common.iter_batches(poll, 3, 500))
+        
+        self.assertEqual(batches, [(records[:2], [0, 1]), (records[2:3], [2])])
+        poll.assert_called_once_with(max_records=3)
     
-    def test_missing_required_params(self):
-        """Test error handling for missing required parameters."""
-        with patch.dict(os.environ, {}, clear=True):
-            with self.assertRaises(KafkaKerberosError) as context:
-                KafkaKerberosUtility()
+    def test_validation_errors(self):
+        """Test error handling for missing or invalid configuration."""
+        for env_vars, expected_error in VALIDATION_CASES:
+            with self.subTest(expected_error=expected_error), fast_env(env_vars):
+                self._expect_error(KafkaKerberosUtility, expected_error)
+    
+    def test_keytab_validation_cached(self):
+        """Test an unchanged keytab is only fully validated once."""
+        # Earlier tests may already have validated the shared keytab
+        KafkaKerberosUtility._validated_keytabs.clear()
+        
+        with fast_env(_ENV_MINIMAL), \
+                patch('kafka_kerberos_utility.os.access', return_value=True) as mock_access, \
+                patch('kafka_kerberos_utility.os.stat', wraps=os.stat) as mock_stat:
+            KafkaKerberosUtility()
+            KafkaKerberosUtility()
             
-            error_msg = str(context.exception)
-            self.assertIn("Missing required configuration parameters", error_msg)
+            mock_access.assert_called_once_with(self.keytab_path, os.R_OK)
+            # A single stat per instance is all the keytab check costs
+            keytab_stats = [args for args, _ in mock_stat.call_args_list if args == (self.keytab_path,)]
+            self.assertEqual(len(keytab_stats), 2)
+        
+        with fast_env({**_ENV_MINIMAL, 'KAFKA_KEYTAB_PATH': self.temp_dir}):
+            self._expect_error(KafkaKerberosUtility, "Keytab file is not a readable file")
     
-    def test_missing_keytab_file(self):
-        """Test error handling for missing keytab file."""
-        env_vars = {
-            'KAFKA_BOOTSTRAP_SERVERS': 'localhost:9092',
-            'KAFKA_TOPIC': 'test-topic',
-            'KAFKA_KEYTAB_PATH': '/nonexistent/keytab',
-            'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM'
-        }
+    def test_keytab_revalidated_after_chmod(self):
+        """Test a permission change invalidates the cached keytab validation."""
+        keytab_path = os.path.join(self.temp_dir, "chmod.keytab")
+        Path(keytab_path).write_text("dummy keytab content")
         
-        with patch.dict(os.environ, env_vars, clear=True):
-            with self.assertRaises(KafkaKerberosError) as context:
-                KafkaKerberosUtility()
+        with fast_env({**_ENV_MINIMAL, 'KAFKA_KEYTAB_PATH': keytab_path}), \
+                patch('kafka_kerberos_utility.os.access', side_effect=[True, False]) as mock_access:
+            KafkaKerberosUtility()
             
-            error_msg = str(context.exception)
-            self.assertIn("Keytab file not found", error_msg)
+            # chmod leaves the mtime alone but changes the ctime
+            os.chmod(keytab_path, 0o000)
+            self._expect_error(KafkaKerberosUtility, "Keytab file is not a readable file")
+            self.assertEqual(mock_access.call_count, 2)
     
-    def test_empty_bootstrap_servers(self):
-        """Test error handling for empty bootstrap servers."""
-        env_vars = {
-            'KAFKA_BOOTSTRAP_SERVERS': '',
-            'KAFKA_TOPIC': 'test-topic',
-            'KAFKA_KEYTAB_PATH': self.keytab_path,
-            'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM'
-        }
+    def test_log_file_honoured_for_every_instance(self):
+        """Test a later instance's log file receives records despite existing log handlers."""
+        log_file = os.path.join(self.temp_dir, "kerberos.log")
+        
+        with fast_env(_ENV_MINIMAL):
+            KafkaKerberosUtility()
+        with fast_env({**_ENV_MINIMAL, 'KAFKA_LOG_FILE': log_file}):
+            utility = KafkaKerberosUtility()
+        
+        utility.logger.info("log file check")
+        # Restarting the listener writes out the queued records
+        kafka_common._restart_log_listener()
+        
+        self.assertIn("log file check", Path(log_file).read_text())
+    
+    def test_jaas_config_opt_in(self):
+        """Test the JAAS file is only generated when requested."""
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            self.assertIsNone(utility.config['jaas_config_path'])
         
-        with patch.dict(os.environ, env_vars, clear=True):
-            with self.assertRaises(KafkaKerberosError) as context:
-                KafkaKerberosUtility()
+        with fast_env({**_ENV_MINIMAL, 'KAFKA_CREATE_JAAS_CONFIG': 'true'}):
+            first = KafkaKerberosUtility()
+            second = KafkaKerberosUtility()
+            jaas_path = first.config['jaas_config_path']
+            
+            self.assertEqual(second.config['jaas_config_path'], jaas_path)
+            self.assertEqual(
+                KafkaKerberosUtility._JAAS_CACHE[(self.keytab_path, 'test@EXAMPLE.COM')], jaas_path
+            )
+            self.assertTrue(os.path.exists(jaas_path))
+            # Written to a private directory, never to a predictable path in /tmp
+            self.assertEqual(os.stat(os.path.dirname(jaas_path)).st_mode & 0o777, 0o700)
+            self.assertEqual(os.stat(jaas_path).st_mode & 0o777, 0o600)
+            with open(jaas_path) as f:
+                self.assertIn(self.keytab_path, f.read())
+            
+            # A cached path whose file was removed is not exported; the file is written again
+            os.remove(jaas_path)
+            third = KafkaKerberosUtility()
+            self.assertTrue(os.path.isfile(third.config['jaas_config_path']))
             
-            error_msg = str(context.exception)
-            self.assertIn("Missing required configuration parameters", error_msg)
+            os.remove(third.config['jaas_config_path'])
+            KafkaKerberosUtility._JAAS_CACHE.pop((self.keytab_path, 'test@EXAMPLE.COM'))
     
-    @patch('kafka_kerberos_utility.KafkaProducer')
-    def test_producer_config(self, mock_producer_class):
-        """Test producer configuration generation."""
+    def test_client_configs(self):
+        """Test producer and consumer configuration generation."""
         env_vars = {
             'KAFKA_BOOTSTRAP_SERVERS': 'broker1:9092,broker2:9092',
             'KAFKA_TOPIC': 'test-topic',
             'KAFKA_KEYTAB_PATH': self.keytab_path,
             'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM',
-            'KAFKA_SERVICE_NAME': 'test-kafka'
+            'KAFKA_SERVICE_NAME': 'test-kafka',
+            'KAFKA_SEND_BUFFER_BYTES': '2097152',
+            'KAFKA_CONSUMER_GROUP_ID': 'test-group',
+            'KAFKA_AUTO_OFFSET_RESET': 'latest',
+            'KAFKA_MAX_POLL_RECORDS': '1000'
         }
         
-        with patch.dict(os.environ, env_vars, clear=True):
-            utility = KafkaKerberosUtility()
+        # One utility serves both client configurations
+        utility = cached_utility(env_vars)
+        
+        with self.subTest(kind='producer'):
             producer_config = utility._get_producer_config()
             
             self.assertEqual(producer_config['bootstrap_servers'], ['broker1:9092', 'broker2:9092'])
             self.assertEqual(producer_config['security_protocol'], 'SASL_PLAINTEXT')
             self.assertEqual(producer_config['sasl_mechanism'], 'GSSAPI')
             self.assertEqual(producer_config['sasl_kerberos_service_name'], 'test-kafka')
+            self.assertEqual(producer_config['send_buffer_bytes'], 2097152)
+            self.assertEqual(producer_config['receive_buffer_bytes'], 1048576)
+            self.assertEqual(producer_config['max_request_size'], 4194304)
+            self.assertTrue(producer_config['enable_idempotence'])
+            self.assertEqual(producer_config['acks'], 'all')
+            self.assertEqual(producer_config['max_in_flight_requests_per_connection'], 5)
             self.assertIn('value_serializer', producer_config)
             self.assertIn('key_serializer', producer_config)
-    
-    @patch('kafka_kerberos_utility.KafkaConsumer')
-    def test_consumer_config(self, mock_consumer_class):
-        """Test consumer configuration generation."""
-        env_vars = {
-            'KAFKA_BOOTSTRAP_SERVERS': 'broker1:9092,broker2:9092',
-            'KAFKA_TOPIC': 'test-topic',
-            'KAFKA_KEYTAB_PATH': self.keytab_path,
-            'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM',
-            'KAFKA_CONSUMER_GROUP_ID': 'test-group',
-            'KAFKA_AUTO_OFFSET_RESET': 'latest',
-            'KAFKA_MAX_POLL_RECORDS': '1000'
-        }
+            
+            serialized = producer_config['value_serializer']({"id": 1, "action": "login"})
+            self.assertIsInstance(serialized, bytes)
+            self.assertEqual(json.loads(serialized), {"id": 1, "action": "login"})
+            self.assertEqual(producer_config['value_serializer'](b'{"id": 1}'), b'{"id": 1}')
+            self.assertEqual(producer_config['key_serializer']("user_1"), b"user_1")
+            self.assertEqual(producer_config['key_serializer'](b"user_1"), b"user_1")
+            self.assertIsNone(producer_config['key_serializer'](None))
         
-        with patch.dict(os.environ, env_vars, clear=True):
-            utility = KafkaKerberosUtility()
+        with self.subTest(kind='consumer'):
             consumer_config = utility._get_consumer_config()
             
             self.assertEqual(consumer_config['bootstrap_servers'], ['broker1:9092', 'broker2:9092'])
@@ -199,46 +465,583 @@ heartbeat_interval_ms = 3000
             self.assertEqual(consumer_config['group_id'], 'test-group')
             self.assertEqual(consumer_config['auto_offset_reset'], 'latest')
             self.assertEqual(consumer_config['max_poll_records'], 1000)
-            self.assertIn('value_deserializer', consumer_config)
+            self.assertEqual(consumer_config['fetch_min_bytes'], 50000)
+            self.assertEqual(consumer_config['fetch_max_wait_ms'], 500)
+            self.assertEqual(consumer_config['max_partition_fetch_bytes'], 4194304)
+            self.assertEqual(consumer_config['consumer_timeout_ms'], 1000)
+            self.assertFalse(consumer_config['enable_auto_commit'])
+            self.assertNotIn('value_deserializer', consumer_config)
             self.assertIn('key_deserializer', consumer_config)
+        
+        with self.subTest(kind='producer', idempotent=False):
+            env_vars['KAFKA_IDEMPOTENT'] = 'false'
+            producer_config = cached_utility(env_vars)._get_producer_config()
+            
+            self.assertNotIn('enable_idempotence', producer_config)
+            self.assertEqual(producer_config['acks'], 1)
+            self.assertEqual(producer_config['retries'], 3)
     
-    def test_context_manager(self):
-        """Test context manager functionality."""
+    def test_produce_message_metadata(self):
+        """Test synchronous production returns True unless metadata is requested."""
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            future = self.mock_producer.return_value.send.return_value
+        
+            self.assertIs(utility.produce_message({"id": 1}), True)
+            future.get.assert_called_once_with(timeout=10)
+        
+            metadata = utility.produce_message({"id": 2}, return_metadata=True)
+            self.assertIs(metadata, future.get.return_value)
+        
+            future.get.side_effect = Exception("delivery failed")
+            with self.assertRaises(KafkaKerberosError):
+                utility.produce_message({"id": 3})
+    
+    def test_produce_message_async(self):
+        """Test asynchronous production does not block and flush drains producers."""
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            producer = self.mock_producer.return_value
+            
+            future = utility.produce_message_async({"id": 1}, key="key_1")
+            
+            producer.send.assert_called_once_with('test-topic', value={"id": 1}, key="key_1")
+            self.assertIs(future, producer.send.return_value)
+            future.get.assert_not_called()
+            future.add_errback.assert_called_once()
+            
+            utility.flush(timeout=5)
+            producer.flush.assert_called_once_with(5)
+    
+    def test_produce_messages_batch(self):
+        """Test batch production sends everything before a single flush."""
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            producer = self.mock_producer.return_value
+            producer.send.return_value.failed.return_value = False
+            
+            sent = utility.produce_messages([{"id": 1}, {"id": 2}], keys=["a", "b"])
+            
+            self.assertEqual(sent, 2)
+            self.assertEqual(producer.send.call_count, 2)
+            producer.flush.assert_called_once_with()
+            producer.send.return_value.get.assert_not_called()
+            
+            producer.send.return_value.failed.return_value = True
+            with self.assertRaises(KafkaKerberosError):
+                utility.produce_messages([{"id": 3}])
+    
+    def test_producer_cache(self):
+        """Test producers are created once per topic and reused."""
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            self.mock_producer.side_effect = lambda **config: MagicMock()
+            
+            default_producer = utility.get_producer()
+            self.assertIs(utility.get_producer('test-topic'), default_producer)
+            other_producer = utility.get_producer('other-topic')
+            self.assertIsNot(other_producer, default_producer)
+            self.assertIs(utility.get_producer('other-topic'), other_producer)
+            self.assertEqual(self.mock_producer.call_count, 2)
+            
+            utility.close()
+            default_producer.close.assert_called_once()
+            self.assertIsNot(utility.get_producer(), default_producer)
+    
+    @patch('kafka_kerberos_utility.ConfluentProducer')
+    def test_confluent_backend(self, mock_confluent_class):
+        """Test the confluent backend builds a librdkafka producer."""
         env_vars = {
-            'KAFKA_BOOTSTRAP_SERVERS': 'localhost:9092',
+            'KAFKA_BOOTSTRAP_SERVERS': 'broker1:9092,broker2:9092',
             'KAFKA_TOPIC': 'test-topic',
             'KAFKA_KEYTAB_PATH': self.keytab_path,
-            'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM'
+            'KAFKA_PRINCIPAL': 'test@EXAMPLE.COM',
+            'KAFKA_BACKEND': 'confluent'
         }
         
-        with patch.dict(os.environ, env_vars, clear=True):
+        with fast_env(env_vars):
+            utility = KafkaKerberosUtility()
+            producer = utility.get_producer()
+            
+            self.assertIs(producer, mock_confluent_class.return_value)
+            confluent_config = mock_confluent_class.call_args[0][0]
+            self.assertEqual(confluent_config['bootstrap.servers'], 'broker1:9092,broker2:9092')
+            self.assertEqual(confluent_config['sasl.mechanism'], 'GSSAPI')
+            self.assertEqual(confluent_config['sasl.kerberos.keytab'], self.keytab_path)
+            self.assertTrue(confluent_config['enable.idempotence'])
+        
+        env_vars['KAFKA_BACKEND'] = 'unknown'
+        with fast_env(env_vars):
+            self._expect_error(KafkaKerberosUtility, "Unsupported producer backend")
+    
+    def test_consume_messages(self):
+        """Test consumption honours max_messages and calls the handler per record."""
+        records = [MagicMock(value=json.dumps({"id": i}).encode()) for i in range(5)]
+        
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            consumer = self.mock_consumer.return_value
+            consumer.poll.side_effect = [{'tp0': records[:2]}, {'tp1': records[2:]}, {}]
+            handler = MagicMock()
+            
+            messages = utility.consume_messages(message_handler=handler, max_messages=3)
+            
+            self.assertEqual(messages, [{"id": 0}, {"id": 1}, {"id": 2}])
+            self.assertEqual(handler.call_count, 3)
+            handler.assert_called_with({"id": 2}, records[2])
+            self.assertEqual(consumer.poll.call_args_list[0][1]['max_records'], 3)
+            self.assertEqual(consumer.poll.call_args_list[1][1]['max_records'], 1)
+            consumer.commit.assert_called_once_with()
+    
+    def test_consume_messages_not_committed_on_handler_error(self):
+        """Test offsets are not committed when the handler raises."""
+        records = [MagicMock(value=json.dumps({"id": i}).encode()) for i in range(2)]
+        
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            consumer = self.mock_consumer.return_value
+            consumer.poll.side_effect = [{'tp0': records}, {}]
+            handler = MagicMock(side_effect=[None, ValueError("boom")])
+            
+            messages = utility.consume_messages(message_handler=handler)
+            
+            self.assertEqual(messages, [{"id": 0}, {"id": 1}])
+            consumer.commit.assert_not_called()
+    
+    def test_consume_messages_parallel(self):
+        """Test parallel consumption assigns one consumer per partition."""
+        def make_consumer(*args, **config):
+            consumer = MagicMock()
+            consumer.poll.side_effect = lambda **kwargs: (
+                {} if consumer.poll.call_count > 1 else
+                {'tp': [MagicMock(value=json.dumps(
+                    {"partition": consumer.assign.call_args[0][0][0].partition}
+                ).encode())]}
+            )
+            return consumer
+        
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            self.mock_consumer.side_effect = make_consumer
+            
+            messages = utility.consume_messages_parallel(partitions=[0, 1, 2])
+            
+            self.assertEqual(messages, [{"partition": 0}, {"partition": 1}, {"partition": 2}])
+            self.assertEqual(self.mock_consumer.call_count, 3)
+    
+    def test_consume_messages_parallel_not_committed_on_handler_error(self):
+        """Test a partition worker does not commit when the handler raises."""
+        def make_consumer(*args, **config):
+            consumer = MagicMock()
+            consumer.poll.side_effect = lambda **kwargs: (
+                {} if consumer.poll.call_count > 1 else
+                {'tp': [MagicMock(value=json.dumps(
+                    {"partition": consumer.assign.call_args[0][0][0].partition}
+                ).encode())]}
+            )
+            consumers.append(consumer)
+            return consumer
+        
+        def handler(message, record):
+            if message["partition"] == 1:
+                raise ValueError("boom")
+        
+        consumers = []
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            self.mock_consumer.side_effect = make_consumer
+            
+            utility.consume_messages_parallel(partitions=[0, 1], message_handler=handler)
+            
+            committed = {consumer.assign.call_args[0][0][0].partition: consumer.commit.called
+                         for consumer in consumers}
+            self.assertEqual(committed, {0: True, 1: False})
+    
+    def test_consume_messages_parallel_uneven_budget(self):
+        """Test max_messages not dividing evenly is never over-consumed or over-committed."""
+        consumers = []
+        
+        def make_consumer(*args, **config):
+            consumer = MagicMock()
+            consumer.poll.side_effect = lambda timeout_ms, max_records: {
+                'tp': [MagicMock(value=b'{"id": 0}')] * max_records
+            }
+            consumer.partitions_for_topic.return_value = {2, 0, 1}
+            consumers.append((config, consumer))
+            return consumer
+        
+        handler = MagicMock()
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            self.mock_consumer.side_effect = make_consumer
+            
+            messages = utility.consume_messages_parallel(max_messages=5, message_handler=handler)
+        
+        self.assertEqual(len(messages), 5)
+        self.assertEqual(handler.call_count, 5)
+        
+        # The partition lookup uses a throwaway consumer outside the group
+        (lookup_config, lookup), *workers = consumers
+        self.assertIsNone(lookup_config['group_id'])
+        lookup.close.assert_called_once()
+        self.assertNotIn(utility._default_topic, utility._consumers)
+        
+        budgets = sorted(consumer.poll.call_args.kwargs['max_records'] for _, consumer in workers)
+        self.assertEqual(budgets, [1, 2, 2])
+        for _, consumer in workers:
+            consumer.commit.assert_called_once()
+        
+        # Fewer messages than partitions: partitions without a budget are not read
+        consumers.clear()
+        with fast_env(_ENV_MINIMAL):
+            messages = utility.consume_messages_parallel(partitions=[0, 1, 2], max_messages=2)
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(len(consumers), 2)
+    
+    @patch('kafka_kerberos_utility.AIOKAFKA_AVAILABLE', True)
+    @patch('kafka_kerberos_utility.AIOKafkaConsumer')
+    def test_aconsume_messages(self, mock_consumer_class):
+        """Test asynchronous consumption awaits coroutine handlers and commits batches."""
+        records = [MagicMock(value={"id": i}) for i in range(2)]
+        consumer = AsyncMock()
+        consumer.getmany.side_effect = [{'tp': records}, {}]
+        mock_consumer_class.return_value = consumer
+        handler = AsyncMock()
+        
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            messages = utility.consume_messages_aiokafka(message_handler=handler)
+            
+            self.assertEqual(messages, [{"id": 0}, {"id": 1}])
+            self.assertEqual(handler.await_count, 2)
+            consumer.commit.assert_awaited_once()
+            consumer.stop.assert_awaited_once()
+    
+    @patch('kafka_kerberos_utility.AIOKAFKA_AVAILABLE', True)
+    @patch('kafka_kerberos_utility.AIOKafkaConsumer')
+    def test_aconsume_messages_not_committed_on_handler_error(self, mock_consumer_class):
+        """Test asynchronous consumption stops committing once the handler raises."""
+        consumer = AsyncMock()
+        consumer.getmany.side_effect = [{'tp': [MagicMock(value={"id": 0})]},
+                                        {'tp': [MagicMock(value={"id": 1})]}, {}]
+        mock_consumer_class.return_value = consumer
+        handler = AsyncMock(side_effect=[ValueError("boom"), None])
+        
+        with fast_env(_ENV_MINIMAL):
+            utility = KafkaKerberosUtility()
+            messages = utility.consume_messages_aiokafka(message_handler=handler)
+            
+            self.assertEqual(messages, [{"id": 0}, {"id": 1}])
+            consumer.commit.assert_not_awaited()
+    
+    def test_context_manager(self):
+        """Test context manager functionality."""
+        with fast_env(_ENV_MINIMAL):
             with KafkaKerberosUtility() as utility:
                 self.assertIsInstance(utility, KafkaKerberosUtility)
                 # The close method should be called automatically
 
 
+# Configuration of the SimpleKafkaUtility tests
+_SIMPLE_CONFIG = MappingProxyType({
+    'bootstrap_servers': 'localhost:9092, localhost:9093',
+    'topic': 'test-topic',
+    'consumer_group_id': 'test-group',
+    'auto_offset_reset': 'earliest',
+    'max_poll_records': 500,
+    'session_timeout_ms': 30000,
+    'heartbeat_interval_ms': 3000,
+})
+
+
+class TestSimpleKafkaUtility(unittest.TestCase):
+    """Test cases for SimpleKafkaUtility class."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Patch the client classes once for the whole class."""
+        cls._producer_patcher = patch('simple_kafka_utility.KafkaProducer')
+        cls._consumer_patcher = patch('simple_kafka_utility.KafkaConsumer')
+        cls.mock_producer = cls._producer_patcher.start()
+        cls.mock_consumer = cls._consumer_patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Stop the client patches."""
+        cls._producer_patcher.stop()
+        cls._consumer_patcher.stop()
+    
+    def setUp(self):
+        """Reset the shared client mocks and create a utility."""
+        self.mock_producer.reset_mock(return_value=True, side_effect=True)
+        self.mock_consumer.reset_mock(return_value=True, side_effect=True)
+        self.utility = SimpleKafkaUtility(dict(_SIMPLE_CONFIG))
+    
+    def test_client_configs(self):
+        """Test both clients get the same parsed bootstrap servers and the codecs."""
+        producer_config = self.utility._get_producer_config()
+        consumer_config = self.utility._get_consumer_config()
+        
+        self.assertEqual(producer_config['bootstrap_servers'], ['localhost:9092', 'localhost:9093'])
+        self.assertEqual(consumer_config['bootstrap_servers'], producer_config['bootstrap_servers'])
+        self.assertIs(producer_config['value_serializer'], kafka_common.serialize_value)
+        self.assertTrue(producer_config['enable_idempotence'])
+        self.assertNotIn('value_deserializer', consumer_config)
+        self.assertEqual(consumer_config['key_deserializer'](b''), '')
+    
+    def test_iter_messages_slices_batches(self):
+        """Test max_messages is enforced across partitions of a polled batch."""
+        records = [MagicMock(value=json.dumps({"id": i}).encode()) for i in range(6)]
+        consumer = self.mock_consumer.return_value
+        consumer.poll.side_effect = [{'tp0': records[:3], 'tp1': records[3:]}, {}]
+        handler = MagicMock()
+        
+        stream = self.utility.iter_messages(message_handler=handler, max_messages=4)
+        
+        # Nothing is polled before the stream is read
+        consumer.poll.assert_not_called()
+        self.assertEqual(list(stream), [{"id": i} for i in range(4)])
+        self.assertEqual(handler.call_count, 4)
+        self.assertEqual(handler.call_args.args, ({"id": 3}, records[3]))
+        consumer.poll.assert_called_once_with(timeout_ms=1000, max_records=4)
+    
+    def test_consume_messages_stops_when_idle(self):
+        """Test consumption without a limit ends on the first empty poll."""
+        consumer = self.mock_consumer.return_value
+        consumer.poll.side_effect = [{'tp0': [MagicMock(value=b'{"id": 0}')]}, {}]
+        
+        self.assertEqual(self.utility.consume_messages(), [{"id": 0}])
+        self.assertEqual(consumer.poll.call_args.kwargs['max_records'], 500)
+    
+    def test_produce_message_async(self):
+        """Test wait=False returns the future with delivery callbacks registered."""
+        future = self.mock_producer.return_value.send.return_value
+        
+        self.assertIs(self.utility.produce_message({"id": 1}, key="k", wait=False), future)
+        
+        future.add_callback.assert_called_once_with(self.utility._on_send_success)
+        future.add_errback.assert_called_once_with(self.utility._on_send_error, 'test-topic')
+        future.get.assert_not_called()
+        
+        # Blocking production waits for the acknowledgement instead
+        self.assertTrue(self.utility.produce_message({"id": 2}))
+        future.get.assert_called_once_with(timeout=10)
+    
+    def test_produce_messages_batch(self):
+        """Test batch production sends everything before a single flush."""
+        producer = self.mock_producer.return_value
+        producer.send.return_value.failed.return_value = False
+        
+        self.assertEqual(self.utility.produce_messages([{"id": 1}, {"id": 2}], keys=[b"a", b"b"]), 2)
+        self.assertEqual(producer.send.call_count, 2)
+        producer.flush.assert_called_once_with()
+        
+        producer.send.return_value.failed.return_value = True
+        with self.assertRaises(SimpleKafkaError):
+            self.utility.produce_messages([{"id": 3}])
+        
+        with self.assertRaises(SimpleKafkaError):
+            self.utility.produce_messages([{"id": 4}], keys=[])
+    
+    def test_producer_shared_across_topics(self):
+        """Test a single producer serves every topic."""
+        self.utility.produce_message({"id": 1}, topic='topic-a')
+        self.utility.produce_message({"id": 2}, topic='topic-b')
+        
+        self.mock_producer.assert_called_once()
+        topics = [call.args[0] for call in self.mock_producer.return_value.send.call_args_list]
+        self.assertEqual(topics, ['topic-a', 'topic-b'])
+    
+    def test_logging_handlers_not_duplicated(self):
+        """Test a second instance does not attach another log handler."""
+        logger = logging.getLogger(simple_kafka_utility.__name__)
+        before = list(logger.handlers)
+        
+        SimpleKafkaUtility(dict(_SIMPLE_CONFIG))
+        
+        self.assertEqual(logger.handlers, before)
+        self.assertEqual(sum(isinstance(h, QueueHandler) for h in logger.handlers), 1)
+    
+    def test_log_records_written_once(self):
+        """Test a record is written once when both utilities are in use."""
+        log_dir = tempfile.mkdtemp(dir=_TEMP_BASE)
+        self.addCleanup(shutil.rmtree, log_dir, True)
+        log_file = os.path.join(log_dir, "simple.log")
+        
+        with fast_env(_ENV_MINIMAL):
+            KafkaKerberosUtility()
+        utility = SimpleKafkaUtility({**_SIMPLE_CONFIG, 'log_file': log_file})
+        
+        with patch.object(QueueHandler, 'enqueue', autospec=True,
+                          side_effect=QueueHandler.enqueue) as mock_enqueue:
+            utility.logger.info("written once")
+        # Restarting the listener writes out the queued records
+        kafka_common._restart_log_listener()
+        
+        self.assertEqual(mock_enqueue.call_count, 1)
+        self.assertEqual(Path(log_file).read_text().count("written once"), 1)
+    
+    def test_close(self):
+        """Test close closes the producer and every consumer and resets the caches."""
+        self.mock_consumer.side_effect = lambda *args, **config: MagicMock()
+        producer = self.utility.get_producer()
+        consumers = [self.utility.get_consumer('topic-a'), self.utility.get_consumer('topic-b')]
+        
+        self.utility.close()
+        
+        producer.close.assert_called_once_with(timeout=10)
+        for consumer in consumers:
+            consumer.close.assert_called_once_with()
+        self.assertIsNone(self.utility._producer)
+        self.assertEqual(self.utility._consumers, {})
+
+
+@patch('kafka_confluent_backend.CONFLUENT_AVAILABLE', True)
+@patch('kafka_confluent_backend.Producer')
+class TestConfluentProducer(unittest.TestCase):
+    """Test cases for the confluent-kafka producer adapter."""
+    
+    def _send(self, mock_producer_class):
+        """Send one message and return the future and the delivery callback it registered."""
+        producer = ConfluentProducer({'bootstrap.servers': 'localhost:9092'},
+                                     value_serializer=kafka_common.serialize_value,
+                                     key_serializer=kafka_common.serialize_key)
+        future = producer.send('test-topic', value={"id": 1}, key="key_1")
+        on_delivery = mock_producer_class.return_value.produce.call_args.kwargs['on_delivery']
+        return producer, future, on_delivery
+    
+    def test_send_serializes_and_polls(self, mock_producer_class):
+        """Test send serializes value and key and serves earlier delivery reports."""
+        self._send(mock_producer_class)
+        rd_producer = mock_producer_class.return_value
+        
+        args, kwargs = rd_producer.produce.call_args
+        self.assertEqual(args, ('test-topic',))
+        self.assertEqual(json.loads(kwargs['value']), {"id": 1})
+        self.assertEqual(kwargs['key'], b"key_1")
+        rd_producer.poll.assert_called_once_with(0)
+    
+    def test_delivery_success(self, mock_producer_class):
+        """Test a successful delivery report resolves the future with the message metadata."""
+        _, future, on_delivery = self._send(mock_producer_class)
+        message = MagicMock()
+        message.topic.return_value, message.partition.return_value, message.offset.return_value = (
+            'test-topic', 2, 42
+        )
+        
+        on_delivery(None, message)
+        
+        self.assertEqual(future.get(timeout=1), DeliveryReport('test-topic', 2, 42))
+    
+    def test_delivery_error(self, mock_producer_class):
+        """Test a failed delivery report makes get raise the delivery error."""
+        _, future, on_delivery = self._send(mock_producer_class)
+        
+        on_delivery("Broker: Message size too large", None)
+        
+        with self.assertRaises(KafkaError) as context:
+            future.get(timeout=1)
+        self.assertIn("Message size too large", str(context.exception))
+    
+    def test_get_polls_until_delivered(self, mock_producer_class):
+        """Test get polls the producer until the delivery report arrives, or times out."""
+        _, future, on_delivery = self._send(mock_producer_class)
+        rd_producer = mock_producer_class.return_value
+        
+        # The report arrives on the third poll made by get
+        rd_producer.poll.reset_mock()
+        rd_producer.poll.side_effect = lambda timeout: (
+            on_delivery(None, MagicMock()) if rd_producer.poll.call_count == 3 else 0
+        )
+        future.get(timeout=5)
+        self.assertEqual(rd_producer.poll.call_count, 3)
+        
+        # No report at all: get gives up once the timeout has elapsed
+        rd_producer.poll.side_effect = None
+        _, future, _ = self._send(mock_producer_class)
+        with self.assertRaises(KafkaTimeoutError):
+            future.get(timeout=0.01)
+    
+    def test_send_retries_on_full_queue(self, mock_producer_class):
+        """Test a full local queue is drained by a poll before the message is produced again."""
+        rd_producer = mock_producer_class.return_value
+        rd_producer.produce.side_effect = [BufferError("Local: Queue full"), None]
+        
+        self._send(mock_producer_class)
+        
+        self.assertEqual(rd_producer.produce.call_count, 2)
+        self.assertEqual(rd_producer.poll.call_args_list[0].args, (1,))
+    
+    def test_flush_raises_on_pending(self, mock_producer_class):
+        """Test flush waits without limit by default and raises if messages remain queued."""
+        producer, _, _ = self._send(mock_producer_class)
+        rd_producer = mock_producer_class.return_value
+        
+        rd_producer.flush.return_value = 0
+        producer.flush()
+        rd_producer.flush.assert_called_with(-1)
+        
+        rd_producer.flush.return_value = 3
+        with self.assertRaises(KafkaTimeoutError) as context:
+            producer.close(timeout=2)
+        rd_producer.flush.assert_called_with(2)
+        self.assertIn("3 messages still pending", str(context.exception))
+    
+    def test_requires_confluent_kafka(self, mock_producer_class):
+        """Test a clear ImportError is raised when confluent-kafka is not installed."""
+        with patch('kafka_confluent_backend.CONFLUENT_AVAILABLE', False):
+            with self.assertRaises(ImportError):
+                ConfluentProducer({}, kafka_common.serialize_value, kafka_common.serialize_key)
+
+
 def run_tests():
-    """Run all tests."""
-    print("Running Kafka Kerberos Utility Tests")
-    print("=" * 50)
+    """
+    Run all tests.
     
-    # Create test suite
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestKafkaKerberosUtility)
+    Tests run in parallel under pytest when pytest-xdist is installed and
+    fall back to the unittest runner otherwise. Output detail is set by the
+    TEST_VERBOSITY environment variable: 0 for CI (no per-test lines or
+    summary), 1 by default, 2 for one line per test.
+    """
+    verbosity = int(os.environ.get("TEST_VERBOSITY", "1"))
     
-    # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    if verbosity >= 1:
+        print("Running Kafka Kerberos Utility Tests")
+        print("=" * 50)
     
-    # Print summary
-    print("\n" + "=" * 50)
-    if result.wasSuccessful():
-        print("✅ All tests passed!")
+    # With pytest-xdist installed (pip install -e .[dev]), spread the tests over all cores
+    try:
+        import pytest
+        import xdist  # noqa: F401
+    except ImportError:
+        pytest = None
+    
+    if pytest is not None:
+        args = [__file__, "-n", "auto"] + {0: ["-q"], 1: []}.get(verbosity, ["-v"])
+        success = pytest.main(args) == 0
+        failures = errors = None
     else:
-        print("❌ Some tests failed!")
-        print(f"Failures: {len(result.failures)}")
-        print(f"Errors: {len(result.errors)}")
+        # Create test suite
+        suite = unittest.TestLoader().loadTestsFromModule(sys.modules[__name__])
+        
+        # Run tests
+        runner = unittest.TextTestRunner(verbosity=verbosity, stream=sys.stderr)
+        result = runner.run(suite)
+        success = result.wasSuccessful()
+        failures, errors = len(result.failures), len(result.errors)
+    
+    # Print summary
+    if verbosity >= 1:
+        print("\n" + "=" * 50)
+        if success:
+            print("✅ All tests passed!")
+        else:
+            print("❌ Some tests failed!")
+            if failures is not None:
+                print(f"Failures: {failures}")
+                print(f"Errors: {errors}")
     
-    return result.wasSuccessful()
+    return success
 
 
 if __name__ == "__main__":